@@ -6,12 +6,13 @@ from typing import Dict, List, Optional
 from fastapi import HTTPException
 
 # Third party imports
-from sqlalchemy import asc, desc
+from sqlalchemy import JSON, asc, desc, insert, literal, select
 from sqlalchemy.orm import Session
 
 from app.audit_trail.models import AuditTrail
 from app.audit_trail.schemas import AuditTrailType
-from app.bpm.models import Case
+from app.bpm.models import Case, CaseStepConfig, CaseType
+from app.core.db import get_current_user_id
 from app.users.models import User
 
 # Local imports
@@ -214,6 +215,63 @@ class AuditTrailService:
             logger.error("Error creating audit trail: %s", e)
             raise e
 
+    def create_audit_trail_for_case_no(
+        self,
+        db: Session,
+        case_no: str,
+        description: str,
+        user: Optional[User] = None,
+        meta_data: Dict = None,
+        audit_type: AuditTrailType = AuditTrailType.AUTOMATED,
+    ) -> int:
+        """
+        Create an audit trail entry for the first case row of a case number
+        without loading the case. The case id, case type and step name are
+        resolved by an INSERT ... SELECT. Returns the number of rows inserted
+        (0 if the case does not exist).
+        """
+        try:
+            case_columns = (
+                select(
+                    Case.id,
+                    CaseType.name,
+                    Case.case_no,
+                    CaseStepConfig.step_name,
+                    literal(user.id if user else None),
+                    literal(user.roles[0].name if user and user.roles else None),
+                    literal(description),
+                    literal(audit_type, AuditTrail.audit_trail_type.type),
+                    literal(meta_data, JSON),
+                    literal(get_current_user_id(db)),
+                )
+                .join(CaseType, Case.case_type_id == CaseType.id)
+                .outerjoin(CaseStepConfig, Case.case_step_config_id == CaseStepConfig.id)
+                .where(Case.case_no == case_no)
+                .order_by(asc(Case.created_on))
+                .limit(1)
+            )
+            result = db.execute(
+                insert(AuditTrail).from_select(
+                    [
+                        AuditTrail.case_id,
+                        AuditTrail.case_type,
+                        AuditTrail.case_no,
+                        AuditTrail.step_name,
+                        AuditTrail.done_by,
+                        AuditTrail.user_role,
+                        AuditTrail.description,
+                        AuditTrail.audit_trail_type,
+                        AuditTrail.meta_data,
+                        AuditTrail.created_by,
+                    ],
+                    case_columns,
+                )
+            )
+            return result.rowcount
+        except Exception as e:
+            logger.error("Error creating audit trail: %s", e)
+            raise e
+
     def update_audit_trail(
         self, db: Session, audit_id: int, update_data: Dict
     ) -> AuditTrail:
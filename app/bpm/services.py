@@ -6,8 +6,8 @@ from datetime import date, datetime, time, timedelta
 from typing import List, Optional, Union
 
 # Third party imports
-from sqlalchemy import and_, asc, desc, func, select
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, asc, desc, func, inspect, select
+from sqlalchemy.orm import Session, aliased, joinedload
 
 from app.bpm.exception import CaseStopException
 
@@ -25,11 +25,34 @@ from app.bpm.models import (
     CaseTypeFirstStep,
     case_step_config_role_table,
 )
+from app.core.db import get_request_cache
 from app.users.models import Role, User
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Request-scoped caches (see get_request_cache) for the lookups BPM steps repeat
+# several times per request: the case entity of a case and its latest case row.
+CASE_ENTITY_CACHE = "bpm_case_entity"
+LATEST_CASE_CACHE = "bpm_latest_case"
+
+
+def _cached(db: Session, namespace: str, case_no: str):
+    """Return a cached object for case_no if it is still attached to the session."""
+    obj = get_request_cache(db, namespace).get(case_no)
+    if obj is None:
+        return None
+    state = inspect(obj)
+    if not (state.persistent or state.pending) or obj in db.deleted:
+        get_request_cache(db, namespace).pop(case_no, None)
+        return None
+    return obj
+
+
+def remember_latest_case(db: Session, case: Case) -> None:
+    """Write a newly added case row through to the latest-case cache."""
+    get_request_cache(db, LATEST_CASE_CACHE)[case.case_no] = case
+
 
 class BPMService:
     def __init__(self):
@@ -71,6 +94,17 @@ class BPMService:
         unique: bool = False,
     ) -> Union[Case, List[Case]]:
         """Get cases by case number or case id"""
+        # Only the plain "latest case for a case number" lookup is cached
+        latest_case_lookup = (
+            case_no
+            and sort_order == "desc"
+            and not multiple
+            and not any((case_id, case_type_name, step_id, case_step_config_id, case_status))
+        )
+        if latest_case_lookup:
+            cached = _cached(db, LATEST_CASE_CACHE, case_no)
+            if cached is not None:
+                return cached
         try:
             query = db.query(Case).join(CaseStatus)
             if case_no:
@@ -102,7 +136,10 @@ class BPMService:
                 if unique:
                     return query.distinct().all()
                 return query.all()
-            return query.first()
+            case = query.first()
+            if latest_case_lookup and case is not None:
+                remember_latest_case(db, case)
+            return case
         except Exception as e:
             logger.error("Error getting cases: %s", e, exc_info=True)
             raise e
@@ -632,6 +669,7 @@ class BPMService:
             db.add(new_case)
             db.commit()
             db.refresh(new_case)
+            remember_latest_case(db, new_case)
             logger.info("Case created successfully: %s", new_case.id)
             return new_case
         except Exception as e:
@@ -671,6 +709,7 @@ class BPMService:
             db.add(new_case)
             db.commit()
             db.refresh(new_case)
+            remember_latest_case(db, new_case)
             logger.info(
                 "Case '%s' has been moved to step '%s'.", case_no, step_config.id
             )
@@ -729,6 +768,7 @@ class BPMService:
             db.add(new_case)
             db.commit()
             db.refresh(new_case)
+            remember_latest_case(db, new_case)
             logger.info("Case current state %s", new_case.case_status.name)
             return {
                 "case": new_case,
@@ -739,8 +779,11 @@ class BPMService:
             logger.error("Error moving case to next step: %s", e)
             raise e
 
-    def mark_case_as_closed(self, db: Session, case_no: str):
-        """Mark the case as closed"""
+    def mark_case_as_closed(self, db: Session, case_no: str, commit: bool = True):
+        """
+        Mark the case as closed. With commit=False the closed case row is only
+        flushed and the caller commits it with its own changes.
+        """
         try:
             logger.info("Closing the case here . . . . . .")
             # TODO: CaseStatus is hardcoded, this needs to move to a config
@@ -778,8 +821,12 @@ class BPMService:
 
             # Step 4: Add the new case to the session and commit
             db.add(new_case)
-            db.commit()
-            db.refresh(new_case)
+            if commit:
+                db.commit()
+                db.refresh(new_case)
+            else:
+                db.flush()
+            remember_latest_case(db, new_case)
             logger.info("Case '%s' has been marked as closed.", case_no)
             return new_case
         except Exception as e:
@@ -793,8 +840,15 @@ class BPMService:
         entity_name: str,
         identifier: str,
         identifier_value: str,
+        flush: bool = True,
+        refresh: bool = True,
     ) -> CaseEntity:
-        """Create a new case entity"""
+        """
+        Create a new case entity. With flush=False the INSERT is left pending so
+        it is sent in the same flush as the caller's other writes. With
+        refresh=False the row is not re-selected after the flush; the primary
+        key is already populated by the INSERT.
+        """
         try:
             case_entity = CaseEntity(
                 case_no=case_no,
@@ -804,8 +858,11 @@ class BPMService:
                 is_active=True,
             )
             db.add(case_entity)
-            db.flush()
-            db.refresh(case_entity)
+            if flush:
+                db.flush()
+                if refresh:
+                    db.refresh(case_entity)
+            get_request_cache(db, CASE_ENTITY_CACHE).setdefault(case_no, case_entity)
             return case_entity
         except Exception as e:
             logger.error("Error creating case entity: %s", str(e))
@@ -840,6 +897,16 @@ class BPMService:
         multiple: bool = False,
     ) -> Union[CaseEntity, List[CaseEntity]]:
         """Get a case entity by case number, entity name, identifier, or identifier value"""
+        # Only the plain lookup by case number is cached
+        case_no_lookup = (
+            case_no
+            and not multiple
+            and not any((entity_name, identifier, identifier_value))
+        )
+        if case_no_lookup:
+            cached = _cached(db, CASE_ENTITY_CACHE, case_no)
+            if cached is not None:
+                return cached
         try:
             query = db.query(CaseEntity)
             if case_no:
@@ -853,11 +920,42 @@ class BPMService:
 
             if multiple:
                 return query.all()
-            return query.first()
+            case_entity = query.first()
+            if case_no_lookup and case_entity is not None:
+                get_request_cache(db, CASE_ENTITY_CACHE)[case_no] = case_entity
+            return case_entity
         except Exception as e:
             logger.error("Error getting case entity: %s", str(e))
             raise e
 
+    def get_case_with_entity(
+        self, db: Session, case_no: str
+    ) -> tuple[Optional[Case], Optional[CaseEntity]]:
+        """
+        Get the case and its case entity (None when not yet created) for a case
+        number in a single query. The case type and step config used by audit
+        trails are loaded eagerly.
+        """
+        try:
+            row = (
+                db.query(Case, CaseEntity)
+                .outerjoin(CaseEntity, CaseEntity.case_no == Case.case_no)
+                .options(
+                    joinedload(Case.case_type),
+                    joinedload(Case.case_step_config),
+                )
+                .filter(Case.case_no == case_no)
+                .order_by(asc(Case.created_on))
+                .first()
+            )
+            if not row:
+                return None, None
+            case, case_entity = row
+            return case, case_entity
+        except Exception as e:
+            logger.error("Error getting case with entity: %s", str(e))
+            raise e
+
     def check_access(
         self,
         db: Session,
@@ -1113,6 +1211,7 @@ class CaseReassignService:
         )
         db.add(new_case)
         db.flush()
+        remember_latest_case(db, new_case)
 
         return "Ok"
 
@@ -1,7 +1,30 @@
 ## app/bpm_flows/allocate_medallion_vehicle/utils.py
 
+from sqlalchemy.orm import object_session
+
+from app.core.db import get_request_cache
+
+VEHICLE_DETAILS_CACHE = "vehicle_details_format"
+
+
 def format_vehicle_details(vehicle):
     """Format vehicle details"""
+    # Formatted details are cached per request, keyed by id and last update
+    db = object_session(vehicle)
+    cache = get_request_cache(db, VEHICLE_DETAILS_CACHE) if db else None
+    version = vehicle.updated_on
+    if cache is not None:
+        cached = cache.get(vehicle.id)
+        if cached and cached[0] == version:
+            return {key: dict(value) for key, value in cached[1].items()}
+
+    formatted = _format_vehicle_details(vehicle)
+    if cache is not None:
+        cache[vehicle.id] = (version, formatted)
+    return {key: dict(value) for key, value in formatted.items()}
+
+
+def _format_vehicle_details(vehicle):
     return {
         "vehicle": {
             "id":vehicle.id,
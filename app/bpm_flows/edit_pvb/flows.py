@@ -3,23 +3,22 @@ from fastapi import HTTPException
 
 from decimal import Decimal
 
+from app.core.db import get_request_service
 from app.utils.logger import get_logger
 from app.bpm.services import bpm_service
 from app.audit_trail.services import audit_trail_service
 from app.bpm.step_info import step
-from app.leases.services import lease_service
 from app.leases.schemas import LeaseStatus
-from app.drivers.services import driver_service
 from app.vehicles.services import vehicle_service
 from app.medallions.services import medallion_service
 from app.uploads.services import upload_service
 from app.pvb.services import PVBService
+from app.pvb.repository import PVB_DETAIL_COLUMNS
 from app.pvb.models import PVBDisposition
 from app.ledger.services import LedgerService
-from app.ledger.repository import LedgerRepository
 from app.ledger.models import PostingCategory , EntryType
-from app.medallions.utils import format_medallion_response
-from app.bpm_flows.edit_pvb.utils import format_pvb_violation
+from app.medallions.utils import get_medallion_owner_name
+from app.bpm_flows.edit_pvb.utils import format_pvb_violation, invalidate_pvb_violation
 
 logger = get_logger(__name__)
 
@@ -35,36 +34,56 @@ def fetch_pvb_details(db: Session, case_no: str, case_params: dict = None):
     """
 
     try:
-        pvb_service = PVBService(db=db)
+        pvb_service = get_request_service(db, PVBService)
         violation = None
         case_entity = bpm_service.get_case_entity(db, case_no=case_no)
         if case_entity:
-            violation = pvb_service.repo.get_violation_by_id(int(case_entity.identifier_value))
+            violation = pvb_service.repo.get_violation_full(
+                int(case_entity.identifier_value), columns=PVB_DETAIL_COLUMNS
+            )
         if not violation and case_params and case_params.get("object_name") == "pvb":
-            violation = pvb_service.repo.get_violation_by_id(int(case_params.get("object_lookup")))
+            violation = pvb_service.repo.get_violation_full(
+                int(case_params.get("object_lookup")), columns=PVB_DETAIL_COLUMNS
+            )
 
         if  not violation:
             return {}
         
         if not case_entity:
             bpm_service.create_case_entity(
-                db, case_no, ENTITY_MAPPER["PVB"], ENTITY_MAPPER["PVB_IDENTIFIER"], str(violation.id)
+                db, case_no, ENTITY_MAPPER["PVB"], ENTITY_MAPPER["PVB_IDENTIFIER"], str(violation.id),
+                refresh=False
             )
 
-        pvb_document = upload_service.get_documents(
+        documents = upload_service.get_documents_multi(
             db=db,
             object_type="pvb",
             object_id=violation.id,
-            document_type="pvb_invoice"
+            document_types=["pvb_invoice"],
+            like_document_types=["additional_document"],
         )
 
-        altered_documents = upload_service.get_documents(
-            db=db,
-            object_type="pvb",
-            object_id=violation.id,
-            like_document_type="additional_document",
-            multiple=True
-        )
+        pvb_document = next(
+            (doc for doc in documents if doc["document_type"] == "pvb_invoice"),
+            None
+        ) or {
+            "document_id": "",
+            "document_name": "",
+            "document_note": "",
+            "document_path": "",
+            "document_type": "pvb_invoice",
+            "document_date": "",
+            "document_object_type": "pvb",
+            "document_object_id": violation.id,
+            "document_size": "",
+            "document_uploaded_date": "",
+            "presigned_url": "",
+        }
+
+        altered_documents = [
+            doc for doc in documents
+            if "additional_document" in (doc["document_type"] or "").lower()
+        ]
 
         if not altered_documents:
             altered_documents = [
@@ -88,8 +107,14 @@ def fetch_pvb_details(db: Session, case_no: str, case_params: dict = None):
 
         pvb_data = format_pvb_violation(violation)
 
-        driver = driver_service.get_drivers(db, id=violation.driver_id) if violation.driver_id else None
-        active_lease = lease_service.get_lease(db,lookup_id=violation.lease_id, status= LeaseStatus.ACTIVE.value) if violation.lease_id else None
+        # Driver and lease are eagerly loaded with the violation; apply the same
+        # active filters the driver/lease service lookups used to enforce.
+        driver = violation.driver if violation.driver and violation.driver.is_active else None
+        active_lease = (
+            violation.lease
+            if violation.lease and violation.lease.lease_status == LeaseStatus.ACTIVE.value
+            else None
+        )
 
         if not driver:
             logger.info("No driver found for TLC case", case_no=case_no)
@@ -119,18 +144,13 @@ def fetch_pvb_details(db: Session, case_no: str, case_params: dict = None):
                 "additional_documents": altered_documents
             }
 
-        medallion_owner = format_medallion_response(active_lease.medallion).get("medallion_owner") if active_lease.medallion else None
+        medallion_owner = get_medallion_owner_name(active_lease.medallion) if active_lease.medallion else None
 
-        lease_confis = active_lease.lease_configuration
         lease_amount = 0
 
-        if lease_confis:
-            config = config = next(
-                (c for c in lease_confis if c.lease_breakup_type == "lease_amount"),
-                None
-            )
-            if config and config.lease_limit:
-                lease_amount = float(config.lease_limit)
+        config = active_lease.lease_configuration_by_type.get("lease_amount")
+        if config and config.lease_limit:
+            lease_amount = float(config.lease_limit)
 
         format_data = {}
         format_data["lease"] = {
@@ -183,14 +203,9 @@ def process_pvb_details(db: Session, case_no: str, step_data: dict):
     try:
         logger.info("Processing PVB violation", case_no=case_no)
 
-        pvb_service = PVBService(db=db)
+        pvb_service = get_request_service(db, PVBService)
 
-        case_entity = bpm_service.get_case_entity(db, case_no=case_no)
-
-        if not case_entity:
-            raise HTTPException(status_code=404, detail="Case entity not found")
-        
-        violation = pvb_service.repo.get_violation_by_id(int(case_entity.identifier_value))
+        violation, case = pvb_service.get_violation_for_case(case_no)
 
         if not violation:
             raise HTTPException(status_code=404, detail="PVB violation not found")
@@ -199,8 +214,9 @@ def process_pvb_details(db: Session, case_no: str, step_data: dict):
         disposition = step_data.get("disposition")
         reduce_by = Decimal(str(step_data.get("reduced_by")))
 
-        ledger_repo = LedgerRepository(db)
-        ledger_service = LedgerService(ledger_repo)
+        ledger_service = get_request_service(
+            db, LedgerService, lambda: LedgerService(pvb_service.ledger_repo)
+        )
 
         if disposition == PVBDisposition.REDUCED.value:
             amount = violation.amount_due - amount_due
@@ -213,7 +229,8 @@ def process_pvb_details(db: Session, case_no: str, step_data: dict):
                 entry_type=EntryType.CREDIT if amount > 0 else EntryType.DEBIT,
                 lease_id=violation.lease_id,
                 medallion_id=violation.medallion_id,
-                vehicle_id=violation.vehicle_id
+                vehicle_id=violation.vehicle_id,
+                commit=False,
             )
         elif disposition == PVBDisposition.DISMISSED.value:
             amount_due = 0
@@ -225,7 +242,8 @@ def process_pvb_details(db: Session, case_no: str, step_data: dict):
                 entry_type=EntryType.CREDIT if violation.amount_due > 0 else EntryType.DEBIT,
                 lease_id=violation.lease_id,
                 medallion_id=violation.medallion_id,
-                vehicle_id=violation.vehicle_id
+                vehicle_id=violation.vehicle_id,
+                commit=False,
             )
 
         violation.amount_due = amount_due
@@ -239,12 +257,9 @@ def process_pvb_details(db: Session, case_no: str, step_data: dict):
         violation.violation_code = step_data.get("violation_code")
         violation.disposition_change_date = step_data.get("disposition_change_date")
         violation.note = step_data.get("note")
+        invalidate_pvb_violation(violation)
 
-        db.add(violation)
-        db.commit()
-        db.refresh(violation)
-
-        case = bpm_service.get_cases(db=db , case_no= case_no)
+        # Ledger entries, the violation UPDATE and the audit INSERT are committed together
         if case:
             audit_trail_service.create_audit_trail(
                 db=db,
@@ -253,6 +268,8 @@ def process_pvb_details(db: Session, case_no: str, step_data: dict):
                 meta_data={"vehicle_id": violation.vehicle_id, "driver_id": violation.driver_id, "lease_id": violation.lease_id, "medallion_id": violation.medallion_id}
             )
 
+        db.commit()
+
         logger.info("Successfully processed PVB violation", case_no=case_no)
 
         return "Ok"
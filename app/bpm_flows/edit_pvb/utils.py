@@ -1,24 +1,55 @@
+from operator import attrgetter
+
+from sqlalchemy.orm import object_session
+
+from app.core.db import get_request_cache
 from app.pvb.models import PVBViolation
 
+PVB_VIOLATION_CACHE = "pvb_violation_format"
+
+_VIOLATION_KEYS = (
+    "id",
+    "plate",
+    "state",
+    "type",
+    "summons",
+    "issue_date",
+    "issue_time",
+    "violation_code",
+    "amount_due",
+    "fine",
+    "processing_fee",
+    "payment",
+    "disposition",
+    "disposition_change_date",
+    "note",
+)
+_get_violation_values = attrgetter(*_VIOLATION_KEYS)
+
 def format_pvb_violation(violation: PVBViolation) -> dict:
     if not violation:
         return {}
-    return {
+
+    # Formatted violations are cached per request, keyed by id and last update
+    db = object_session(violation)
+    cache = get_request_cache(db, PVB_VIOLATION_CACHE) if db else None
+    version = violation.updated_on
+    if cache is not None:
+        cached = cache.get(violation.id)
+        if cached and cached[0] == version:
+            return dict(cached[1])
+
+    formatted = {
         "source": violation.source.value,
-        "id": violation.id,
-        "plate": violation.plate,
-        "state": violation.state,
-        "type": violation.type,
-        "summons": violation.summons,
-        "issue_date": violation.issue_date,
-        "issue_time": violation.issue_time,
-        "violation_code": violation.violation_code,
-        "amount_due": violation.amount_due,
-        "fine": violation.fine,
-        "processing_fee": violation.processing_fee,
-        "payment": violation.payment,
-        "disposition": violation.disposition,
-        "disposition_change_date": violation.disposition_change_date,
-        "note": violation.note,
+        **dict(zip(_VIOLATION_KEYS, _get_violation_values(violation))),
         "reduce_by": violation.reduce_to,
-    }
\ No newline at end of file
+    }
+    if cache is not None:
+        cache[violation.id] = (version, formatted)
+    return dict(formatted)
+
+def invalidate_pvb_violation(violation: PVBViolation) -> None:
+    """Drop the cached formatting of a violation after it has been modified."""
+    db = object_session(violation)
+    if db:
+        get_request_cache(db, PVB_VIOLATION_CACHE).pop(violation.id, None)
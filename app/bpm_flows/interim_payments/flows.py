@@ -1,29 +1,33 @@
 # app/bpm_flows/interim_payments/flows.py (COMPLETE REWRITE)
 
-from datetime import datetime
 from typing import Dict, Any, Optional
 from decimal import Decimal
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, load_only
 
 from app.audit_trail.services import audit_trail_service
 from app.bpm.services import bpm_service
 from app.bpm.step_info import step
+from app.drivers.models import Driver
 from app.drivers.services import driver_service
 from app.interim_payments.models import (
     InterimPayment, 
-    PaymentMethod, 
     PaymentStatus,
     InterimPaymentAllocation
 )
+from app.interim_payments.schemas import InterimPaymentAllocationsIn, InterimPaymentIn
 from app.interim_payments.services import InterimPaymentService
+from app.interim_payments.tasks import generate_interim_payment_receipt_task
 from app.interim_payments.validators import InterimPaymentValidator
+from app.leases.models import Lease
 from app.leases.services import lease_service
 from app.ledger.services import LedgerService
-from app.ledger.repository import LedgerRepository
+from app.ledger.repository import OPEN_BALANCE_LIST_COLUMNS, LedgerRepository
 from app.ledger.models import LedgerBalance, BalanceStatus
-from app.utils.s3_utils import s3_utils
+from app.core.db import get_request_service
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -34,6 +38,14 @@ entity_mapper = {
     "INTERIM_PAYMENT_IDENTIFIER": "id"
 }
 
+# Fixed error details; unexpected errors are logged with their traceback
+_ERR_NO_PAYMENT_ENTRY = "No interim payment entry found. Please complete Step 1 first."
+_ERR_NO_ALLOCATIONS = "At least one allocation is required."
+_ERR_FETCH_DRIVER_DETAILS = "An error occurred while fetching driver details."
+_ERR_CREATE_PAYMENT_ENTRY = "Failed to create interim payment entry."
+_ERR_FETCH_OUTSTANDING_BALANCES = "An error occurred while fetching outstanding balances."
+_ERR_PROCESS_ALLOCATION = "Failed to process payment allocation."
+
 # ============================================================================
 # STEP 210: SEARCH DRIVER & ENTER PAYMENT DETAILS
 # ============================================================================
@@ -76,8 +88,10 @@ def fetch_driver_and_lease_details(
                 detail=f"Driver not found with TLC License: {tlc_license_no}"
             )
         
-        # Get all active leases for this driver
-        leases = lease_service.get_lease(db, driver_id=driver.driver_id, status="Active")
+        # Get all active leases for this driver, with medallion and vehicle loaded
+        leases = lease_service.get_leases_with_refs(
+            db, driver_id=driver.driver_id, status="Active"
+        )
         
         if not leases:
             raise HTTPException(
@@ -89,7 +103,8 @@ def fetch_driver_and_lease_details(
         driver_data = {
             "driver_id": driver.id,
             "driver_name": driver.full_name,
-            "tlc_license": driver.tlc_license.tlc_license_number if driver.tlc_license else "N/A",
+            # The driver was matched on this exact TLC license number
+            "tlc_license": tlc_license_no,
         }
         
         # Format leases
@@ -99,20 +114,19 @@ def fetch_driver_and_lease_details(
                 "lease_id": lease.id,
                 "lease_reference": lease.lease_id,
                 "medallion_no": lease.medallion.medallion_number if lease.medallion else "N/A",
-                "vehicle_plate": lease.vehicle.plate_number if lease.vehicle else "N/A",
-                "lease_status": lease.status,
+                "vehicle_plate": (lease.vehicle.get_active_plate_number() or "N/A") if lease.vehicle else "N/A",
+                "lease_status": lease.lease_status,
             })
         
         # Check if payment already exists (Edit mode)
         existing_payment = None
         selected_interim_payment_id = None
-        case_entity = bpm_service.get_case_entity(db, case_no=case_no)
+        interim_payment_service = get_request_service(db, InterimPaymentService)
+        case_entity, existing_payment_obj = (
+            interim_payment_service.repo.get_case_entity_with_payment(case_no)
+        )
         
         if case_entity:
-            existing_payment_obj = db.query(InterimPayment).filter(
-                InterimPayment.id == int(case_entity.identifier_value)
-            ).first()
-            
             if existing_payment_obj:
                 existing_payment = {
                     "interim_payment_id": existing_payment_obj.id,
@@ -146,10 +160,7 @@ def fetch_driver_and_lease_details(
             f"Error fetching driver and lease details for case {case_no}: {e}",
             exc_info=True
         )
-        raise HTTPException(
-            status_code=500,
-            detail=f"An error occurred while fetching driver details: {str(e)}"
-        ) from e
+        raise HTTPException(status_code=500, detail=_ERR_FETCH_DRIVER_DETAILS)
 
 
 @step(step_id="210", name="Process - Create/Update Payment Details", operation="process")
@@ -172,80 +183,45 @@ def create_interim_payment_record(
     try:
         logger.info(f"Creating/Updating interim payment entry for case {case_no}")
         
-        # Check if case entity already exists
-        case_entity = bpm_service.get_case_entity(db, case_no=case_no)
-        
-        # Extract and validate required fields
-        driver_id = step_data.get("driver_id")
-        lease_id = step_data.get("lease_id")
-        payment_amount = step_data.get("payment_amount")
-        payment_method = step_data.get("payment_method")
-        payment_date_str = step_data.get("payment_date")
-        notes = step_data.get("notes")
+        # Check if case entity already exists; the case is fetched alongside it
+        case, case_entity = bpm_service.get_case_with_entity(db, case_no=case_no)
         
-        # Validation: Required fields
-        if not driver_id or not lease_id:
-            raise HTTPException(
-                status_code=400,
-                detail="Driver and lease selection is required"
-            )
-        
-        if not payment_amount or payment_amount <= 0:
-            raise HTTPException(
-                status_code=400,
-                detail="Payment amount must be greater than zero"
-            )
-        
-        if not payment_method:
-            raise HTTPException(
-                status_code=400,
-                detail="Payment method is required"
-            )
-        
-        if not payment_date_str:
-            raise HTTPException(
-                status_code=400,
-                detail="Payment date is required"
-            )
-        
-        # Parse payment date
+        # Validate and coerce the payment details in one pass
         try:
-            payment_date = datetime.fromisoformat(payment_date_str.replace('Z', "+00:00"))
-        except (ValueError, AttributeError) as e:
+            payment_details = InterimPaymentIn.model_validate(step_data)
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid payment date format. Use ISO 8601 format (YYYY-MM-DD). Error: {str(e)}"
+                detail=f"Invalid payment details: {field}: {error['msg']}"
             ) from e
         
-        # Validate payment method enum
-        try:
-            payment_method_enum = PaymentMethod(payment_method)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid payment method: {payment_method}. Valid options: CASH, CHECK, ACH"
-            ) from e
+        driver_id = payment_details.driver_id
+        lease_id = payment_details.lease_id
+        payment_amount = payment_details.payment_amount
+        payment_method_enum = payment_details.payment_method
+        payment_method = payment_method_enum.value
+        payment_date = payment_details.payment_date
+        notes = payment_details.notes
         
-        # Verify driver and lease exist
-        driver = driver_service.get_drivers(db, id=driver_id)
-        if not driver:
+        # Verify driver and lease exist (existence probes, no row hydration)
+        if not driver_service.exists(db, id=driver_id):
             raise HTTPException(status_code=404, detail=f"Driver {driver_id} not found")
         
-        lease = lease_service.get_lease(db, lookup_id=str(lease_id))
-        if not lease:
+        if not lease_service.exists(db, id=lease_id):
             raise HTTPException(status_code=404, detail=f"Lease {lease_id} not found")
         
         # Calculate total outstanding for this lease (for UI display)
-        repo = LedgerRepository(db)
-        open_balances = repo.get_open_balances_by_lease(lease_id=lease.id)
-        total_outstanding = sum(float(b.balance) for b in open_balances)
+        repo = get_request_service(db, LedgerRepository)
+        total_outstanding = float(repo.sum_open_balance_by_lease(lease_id=lease_id))
         
         # Get current user ID
         current_user_id = db.info.get("current_user_id", 1)
         
         # ========== UPDATE MODE ==========
         if case_entity:
-            interim_payment_service = InterimPaymentService(db)
+            interim_payment_service = get_request_service(db, InterimPaymentService)
             interim_payment = interim_payment_service.repo.get_payment_by_id(
                 int(case_entity.identifier_value)
             )
@@ -256,29 +232,39 @@ def create_interim_payment_record(
                 original_method = interim_payment.payment_method.value
                 
                 # Update payment details
-                interim_payment.driver_id = driver.id
-                interim_payment.lease_id = lease.id
+                interim_payment.driver_id = driver_id
+                interim_payment.lease_id = lease_id
                 interim_payment.payment_date = payment_date
                 interim_payment.total_amount = payment_amount
                 interim_payment.payment_method = payment_method_enum
                 interim_payment.notes = notes
                 interim_payment.updated_by = current_user_id
                 
-                # CRITICAL: Clear allocations if they exist
-                if interim_payment.allocations:
+                # CRITICAL: Clear allocations if they exist. Structured allocation
+                # rows are removed with one DELETE instead of through the collection.
+                cleared_records = interim_payment_service.repo.delete_allocations(
+                    interim_payment.id
+                )
+                db.expire(interim_payment, ["allocation_records"])
+                if cleared_records:
                     logger.warning(
                         f"Clearing existing allocations for payment {interim_payment.payment_id} "
                         f"because payment details were modified",
-                        allocations_count=len(interim_payment.allocations),
+                        deleted_allocation_rows=cleared_records,
+                        json_allocations=len(interim_payment.allocations or []),
                         case_no=case_no
                     )
-                    interim_payment.allocations = []
+                # The JSON summary is written together with the allocation rows
+                # in step 211; clear it unconditionally instead of inspecting it
+                interim_payment.allocations = []
                 
+                # Read the identifiers before the commit expires the instance, so
+                # no reload is needed afterwards
+                interim_payment_pk, interim_payment_no = interim_payment.id, interim_payment.payment_id
                 db.commit()
-                db.refresh(interim_payment)
                 
                 logger.info(
-                    f"Updated interim payment {interim_payment.payment_id}",
+                    f"Updated interim payment {interim_payment_no}",
                     case_no=case_no,
                     original_amount=float(original_amount),
                     new_amount=float(payment_amount),
@@ -288,34 +274,35 @@ def create_interim_payment_record(
                 
                 return {
                     "message": "Payment details updated successfully",
-                    "interim_payment_id": str(interim_payment.id),
+                    "interim_payment_id": str(interim_payment_pk),
                     "operation": "UPDATE",
                     "allocations_cleared": True,
                     "total_outstanding": round(total_outstanding, 2)
                 }
         
         # ========== CREATE MODE ==========
-        interim_payment_service = InterimPaymentService(db)
+        interim_payment_service = get_request_service(db, InterimPaymentService)
         payment_id = interim_payment_service._generate_next_payment_id()
         
         # FIXED: Now sets status=ACTIVE
-        new_interim_payment = InterimPayment(
-            payment_id=payment_id,
-            case_no=case_no,
-            driver_id=driver.id,
-            lease_id=lease.id,
-            payment_date=payment_date,
-            payment_method=payment_method_enum,
-            total_amount=payment_amount,
-            notes=notes,
-            allocations=[],
-            status=PaymentStatus.ACTIVE,  # ✅ FIXED: Set initial status
-            created_by=current_user_id
-        )
-        
-        db.add(new_interim_payment)
-        db.flush()
-        db.refresh(new_interim_payment)
+        # A Core INSERT reports the new primary key (cursor lastrowid) in the same
+        # round trip, without the flush + refresh SELECT of the ORM path
+        new_interim_payment_id = db.execute(
+            insert(InterimPayment)
+            .values(
+                payment_id=payment_id,
+                case_no=case_no,
+                driver_id=driver_id,
+                lease_id=lease_id,
+                payment_date=payment_date,
+                payment_method=payment_method_enum,
+                total_amount=payment_amount,
+                notes=notes,
+                allocations=[],
+                status=PaymentStatus.ACTIVE,  # ✅ FIXED: Set initial status
+                created_by=current_user_id
+            )
+        ).inserted_primary_key[0]
         
         # Create case entity linking to this interim payment
         bpm_service.create_case_entity(
@@ -323,14 +310,22 @@ def create_interim_payment_record(
             case_no=case_no,
             entity_name=entity_mapper["INTERIM_PAYMENT"],
             identifier=entity_mapper["INTERIM_PAYMENT_IDENTIFIER"],
-            identifier_value=str(new_interim_payment.id)
+            identifier_value=str(new_interim_payment_id),
+            flush=False
         )
         
         db.commit()
         
+        # Only the identifying columns are needed for the log and audit trail
+        driver = db.get(
+            Driver, driver_id,
+            options=[load_only(Driver.id, Driver.driver_id, Driver.full_name)]
+        )
+        lease = db.get(Lease, lease_id, options=[load_only(Lease.id, Lease.lease_id)])
+        
         logger.info(
             f"Created interim payment entry",
-            interim_payment_id=new_interim_payment.id,
+            interim_payment_id=new_interim_payment_id,
             payment_id=payment_id,
             lease_id=lease.lease_id,
             driver=driver.driver_id,
@@ -339,14 +334,13 @@ def create_interim_payment_record(
         )
         
         # Create audit trail
-        case = bpm_service.get_cases(db=db, case_no=case_no)
         if case:
             audit_trail_service.create_audit_trail(
                 db=db,
                 case=case,
                 description=f"Created interim payment of ${payment_amount:.2f} ({payment_method}) for driver {driver.driver_id} and lease {lease.lease_id}",
                 meta_data={
-                    "interim_payment_id": new_interim_payment.id,
+                    "interim_payment_id": new_interim_payment_id,
                     "payment_id": payment_id,
                     "driver_id": driver.id,
                     "driver_name": driver.full_name,
@@ -354,13 +348,13 @@ def create_interim_payment_record(
                     "lease_reference": lease.lease_id,
                     "payment_amount": float(payment_amount),
                     "payment_method": payment_method,
-                    "payment_date": payment_date_str
+                    "payment_date": payment_date.isoformat()
                 }
             )
         
         return {
             "message": "Interim payment entry created successfully.",
-            "interim_payment_id": str(new_interim_payment.id),
+            "interim_payment_id": str(new_interim_payment_id),
             "payment_id": payment_id,
             "operation": "CREATE",
             "total_outstanding": round(total_outstanding, 2)
@@ -375,10 +369,7 @@ def create_interim_payment_record(
             f"Error creating interim payment entry for case {case_no}: {e}",
             exc_info=True
         )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to create interim payment entry: {str(e)}"
-        ) from e
+        raise HTTPException(status_code=500, detail=_ERR_CREATE_PAYMENT_ENTRY)
 
 
 # ============================================================================
@@ -400,18 +391,18 @@ def fetch_outstanding_balances(
     try:
         logger.info(f"Fetching outstanding balances for case {case_no}")
         
-        # Get the interim payment entry from case entity
-        case_entity = bpm_service.get_case_entity(db, case_no=case_no)
+        # Get the case entity together with the interim payment it references,
+        # and the payment's driver and lease
+        interim_payment_service = get_request_service(db, InterimPaymentService)
+        case_entity, interim_payment = (
+            interim_payment_service.repo.get_case_entity_with_payment(
+                case_no, with_context=True
+            )
+        )
         
         if not case_entity:
             return {}
         
-        # Retrieve the interim payment record
-        interim_payment_service = InterimPaymentService(db)
-        interim_payment = interim_payment_service.repo.get_payment_by_id(
-            int(case_entity.identifier_value)
-        )
-        
         if not interim_payment:
             raise HTTPException(
                 status_code=404,
@@ -426,15 +417,14 @@ def fetch_outstanding_balances(
             f"Fetching balances for driver {selected_driver_id} and lease {selected_lease_id}"
         )
         
-        # Retrieve driver and lease objects
-        driver = driver_service.get_drivers(db, id=selected_driver_id)
-        if not driver:
+        driver = interim_payment.driver
+        if not driver or not driver.is_active:
             raise HTTPException(
                 status_code=404,
                 detail=f"Driver {selected_driver_id} not found"
             )
         
-        lease = lease_service.get_lease(db, lookup_id=str(selected_lease_id))
+        lease = interim_payment.lease
         if not lease:
             raise HTTPException(
                 status_code=404,
@@ -442,27 +432,32 @@ def fetch_outstanding_balances(
             )
         
         # Fetch open balances for THIS SPECIFIC LEASE ONLY
-        repo = LedgerRepository(db)
+        repo = get_request_service(db, LedgerRepository)
         open_balances = repo.get_open_balances_by_lease(
             lease_id=lease.id,
-            driver_id=driver.id
+            driver_id=driver.id,
+            columns=OPEN_BALANCE_LIST_COLUMNS,
         )
         
-        # Format balances for UI
-        formatted_balances = []
-        for balance in open_balances:
-            formatted_balances.append({
+        # Format balances for UI. Amounts stay Decimal; the response encoder
+        # renders Numeric(10, 2) values as JSON numbers.
+        formatted_balances = [
+            {
                 "balance_id": str(balance.id),
                 "category": balance.category.value,
                 "reference_id": balance.reference_id,
                 "description": f"{balance.category.value} - {balance.reference_id}",
-                "outstanding": float(balance.balance),
-                "original_amount": float(balance.original_amount),
-                "due_date": balance.created_on.strftime("%Y-%m-%d") if balance.created_on else None,
+                "outstanding": balance.balance,
+                "original_amount": balance.original_amount,
+                "due_date": balance.created_on.date().isoformat() if balance.created_on else None,
                 "status": balance.status.value
-            })
+            }
+            for balance in open_balances
+        ]
         
-        total_outstanding = sum(b['outstanding'] for b in formatted_balances)
+        total_outstanding = float(
+            sum((balance.balance for balance in open_balances), Decimal("0"))
+        )
         
         # Format driver details
         driver_details = {
@@ -497,10 +492,7 @@ def fetch_outstanding_balances(
             f"Error fetching outstanding balances for case {case_no}: {e}",
             exc_info=True
         )
-        raise HTTPException(
-            status_code=500,
-            detail=f"An error occurred while fetching outstanding balances: {str(e)}"
-        ) from e
+        raise HTTPException(status_code=500, detail=_ERR_FETCH_OUTSTANDING_BALANCES)
 
 
 @step(step_id="211", name="Process - Allocate Payments", operation="process")
@@ -522,24 +514,24 @@ def process_payment_allocation(
     5. Update the interim payment record with allocations
     6. Apply allocations to ledger (creates CREDIT postings)
     7. ✅ CREATE STRUCTURED ALLOCATION RECORDS
-    8. Generate and upload receipt to S3
+    8. Schedule receipt generation and upload to S3
     9. Mark BPM case as closed
     10. Create audit trail
     """
     try:
         logger.info(f"Processing payment allocation for case {case_no}")
         
-        # Get the interim payment entry from case entity
-        case_entity = bpm_service.get_case_entity(db, case_no=case_no)
+        # Get the interim payment entry from case entity, with the case for the audit trail
+        case, case_entity = bpm_service.get_case_with_entity(db, case_no=case_no)
         
         if not case_entity:
             raise HTTPException(
                 status_code=404,
-                detail="No interim payment entry found. Please complete Step 1 first."
+                detail=_ERR_NO_PAYMENT_ENTRY
             )
         
         # Retrieve the interim payment record
-        interim_payment_service = InterimPaymentService(db)
+        interim_payment_service = get_request_service(db, InterimPaymentService)
         interim_payment = interim_payment_service.repo.get_payment_by_id(
             int(case_entity.identifier_value)
         )
@@ -569,7 +561,7 @@ def process_payment_allocation(
         if not allocations or len(allocations) == 0:
             raise HTTPException(
                 status_code=400,
-                detail="At least one allocation is required."
+                detail=_ERR_NO_ALLOCATIONS
             )
         
         # ✅ COMPREHENSIVE VALIDATION using validator
@@ -580,23 +572,39 @@ def process_payment_allocation(
             lease_id=selected_lease_id
         )
         
-        # Validate total allocated amount
-        total_allocated = sum(Decimal(str(alloc.get("amount", 0))) for alloc in allocations)
-        
-        if total_allocated > payment_amount:
+        # Coerce the allocations once; amounts arrive as Decimal
+        try:
+            allocation_items = InterimPaymentAllocationsIn.model_validate(
+                {"allocations": allocations}
+            ).allocations
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
             raise HTTPException(
                 status_code=400,
-                detail=f"Total allocated (${total_allocated}) cannot exceed payment (${payment_amount})."
-            )
+                detail=f"Invalid allocations: {field}: {error['msg']}"
+            ) from e
         
-        # Format allocations
+        # Format allocations. allocation_dict maps reference_id to the Decimal
+        # amount applied to the ledger.
         formatted_allocations = []
-        for alloc in allocations:
+        allocation_dict = {}
+        total_allocated = Decimal("0")
+        for alloc in allocation_items:
+            total_allocated += alloc.amount
             formatted_allocations.append({
-                "category": alloc.get("category"),
-                "reference_id": alloc.get("reference_id"),
-                "amount": float(alloc.get("amount")),
+                "category": alloc.category,
+                "reference_id": alloc.reference_id,
+                "amount": float(alloc.amount),
             })
+            allocation_dict[alloc.reference_id] = alloc.amount
+        
+        # Validate total allocated amount
+        if total_allocated > payment_amount:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Total allocated (${total_allocated}) cannot exceed payment (${payment_amount})."
+            )
         
         # Update the interim payment record
         interim_payment.allocations = formatted_allocations
@@ -608,29 +616,22 @@ def process_payment_allocation(
         # Ensure status is ACTIVE
         interim_payment.status = PaymentStatus.ACTIVE
         
-        db.commit()
-        db.refresh(interim_payment)
-        
         logger.info(
             f"Updated interim payment {interim_payment.payment_id} "
             f"with {len(formatted_allocations)} allocation(s)"
         )
         
         # Apply allocations to ledger (SYNC method, not async)
-        allocation_dict = {
-            alloc["reference_id"]: Decimal(str(alloc["amount"]))
-            for alloc in formatted_allocations
-        }
-        
-        repo = LedgerRepository(db)
-        ledger_service = LedgerService(repo)
+        repo = get_request_service(db, LedgerRepository)
+        ledger_service = get_request_service(db, LedgerService, lambda: LedgerService(repo))
         
         created_postings = ledger_service.apply_interim_payment(
             payment_amount=payment_amount,
             allocations=allocation_dict,
             driver_id=selected_driver_id,
             lease_id=selected_lease_id,
-            payment_method=payment_method
+            payment_method=payment_method,
+            commit=False,
         )
         
         logger.info(
@@ -640,69 +641,40 @@ def process_payment_allocation(
         # ✅ CREATE STRUCTURED ALLOCATION RECORDS
         current_user_id = db.info.get("current_user_id", 1)
         
+        # Get the ledger balances for all allocations in one query
+        balances = repo.get_latest_balances_by_reference_ids(
+            [alloc["reference_id"] for alloc in formatted_allocations]
+        )
+        
+        allocation_rows = []
         for alloc in formatted_allocations:
-            # Get the ledger balance
-            balance = repo.get_balance_by_reference_id(alloc["reference_id"])
+            balance = balances.get(alloc["reference_id"])
             
             if balance:
-                allocation_record = InterimPaymentAllocation(
-                    interim_payment_id=interim_payment.id,
-                    ledger_balance_id=str(balance.id),
-                    category=alloc["category"],
-                    reference_id=alloc["reference_id"],
-                    allocated_amount=Decimal(str(alloc["amount"])),
-                    balance_before=None,  # Could capture before application
-                    balance_after=balance.balance,
-                    created_by=current_user_id
-                )
-                db.add(allocation_record)
-        
-        db.commit()
+                allocation_rows.append({
+                    "interim_payment_id": interim_payment.id,
+                    "ledger_balance_id": str(balance.id),
+                    "category": alloc["category"],
+                    "reference_id": alloc["reference_id"],
+                    "allocated_amount": allocation_dict[alloc["reference_id"]],
+                    "balance_before": None,  # Could capture before application
+                    "balance_after": balance.balance,
+                    "created_by": current_user_id,
+                })
+        
+        if allocation_rows:
+            db.execute(insert(InterimPaymentAllocation), allocation_rows)
         
         logger.info(
             f"Created {len(formatted_allocations)} structured allocation records"
         )
         
-        # Generate and upload receipt
-        receipt_url = None
-        try:
-            from app.interim_payments.pdf_service import InterimPaymentPdfService
-            
-            pdf_service = InterimPaymentPdfService(db)
-            receipt_pdf = pdf_service.generate_receipt_pdf(interim_payment.id)
-            
-            # Upload to S3
-            s3_key = f"receipts/interim_payments/{interim_payment.payment_id}.pdf"
-            upload_success = s3_utils.upload_file(
-                file_obj=receipt_pdf,
-                key=s3_key,
-                content_type="application/pdf"
-            )
-            
-            if upload_success:
-                interim_payment.receipt_s3_key = s3_key
-                db.commit()
-                receipt_url = s3_utils.generate_presigned_url(s3_key)
-                logger.info(f"Uploaded receipt to S3: {s3_key}")
-            else:
-                logger.error(
-                    f"Failed to upload receipt to S3 for payment {interim_payment.payment_id}"
-                )
-                
-        except Exception as receipt_error:
-            logger.error(
-                f"Error generating/storing receipt: {str(receipt_error)}",
-                exc_info=True
-            )
-            # Don't fail the entire transaction for receipt errors
-        
         # Mark BPM case as closed
-        bpm_service.mark_case_as_closed(db, case_no)
+        bpm_service.mark_case_as_closed(db, case_no, commit=False)
         
         logger.info(f"Marked case {case_no} as closed")
         
         # Create audit trail
-        case = bpm_service.get_cases(db=db, case_no=case_no)
         if case:
             audit_trail_service.create_audit_trail(
                 db=db,
@@ -720,6 +692,22 @@ def process_payment_allocation(
                 }
             )
         
+        # Payment, ledger postings, allocation records, case closure and audit
+        # trail are committed together
+        db.commit()
+        
+        # Generate and upload the receipt in the background. Until it is stored
+        # the receipt endpoint renders it on demand.
+        receipt_url = None
+        try:
+            generate_interim_payment_receipt_task.delay(interim_payment.id)
+        except Exception as receipt_error:
+            logger.error(
+                f"Error scheduling receipt generation: {str(receipt_error)}",
+                exc_info=True
+            )
+            # The payment is already committed; don't fail the step for receipt errors
+        
         return {
             "message": "Interim payment successfully created and allocated.",
             "payment_id": interim_payment.payment_id,
@@ -736,7 +724,4 @@ def process_payment_allocation(
             f"Error processing payment allocation for case {case_no}: {e}",
             exc_info=True
         )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to process payment allocation: {str(e)}"
-        ) from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=_ERR_PROCESS_ALLOCATION)
\ No newline at end of file
@@ -125,12 +125,7 @@ def fetch_lease_details(db, case_no, case_params=None):
             ).strftime("%Y-%m-%d")
 
         # Get termination reasons from config
-        termination_reasons_list = []
-        if settings.lease_termination_reasons:
-            termination_reasons_list = [
-                reason.strip()
-                for reason in settings.lease_termination_reasons.split(",")
-            ]
+        termination_reasons_list = list(settings.lease_termination_reason_list)
 
         return {
             "lease_case_details": lease_case_details,
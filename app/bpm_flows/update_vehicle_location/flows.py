@@ -1,15 +1,21 @@
 # Third party imports
-from datetime import datetime
+import hashlib
+import json
+from datetime import date
+from types import MappingProxyType
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, cast, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.audit_trail.services import audit_trail_service
+from app.bpm.models import CaseEntity
 from app.bpm.services import bpm_service
 from app.bpm.step_info import step
 from app.bpm_flows.allocate_medallion_vehicle.utils import format_vehicle_details
 
 # Local imports
 from app.utils.logger import get_logger
+from app.vehicles.models import Vehicle
 from app.vehicles.schemas import VehicleLocation, VehicleStatus
 from app.vehicles.services import vehicle_service
 
@@ -56,6 +62,68 @@ VEHICLE_LOCATION_RULES = {
     },
 }
 
+# Read-only views of the rules, built once at import. The same objects are
+# returned for every request, so they must not be mutated by callers.
+_LOCATION_RULES_BY_STATUS = {
+    status: MappingProxyType(
+        {
+            **rules,
+            "allowed_locations": (
+                tuple(rules["allowed_locations"])
+                if rules["allowed_locations"] is not None
+                else None
+            ),
+        }
+    )
+    for status, rules in VEHICLE_LOCATION_RULES.items()
+}
+_NO_LOCATION_RULES = MappingProxyType({})
+
+# The rules are static, so their JSON body and ETag are computed once
+VEHICLE_LOCATION_RULES_JSON = json.dumps(
+    VEHICLE_LOCATION_RULES, sort_keys=True, separators=(",", ":")
+).encode()
+VEHICLE_LOCATION_RULES_ETAG = f'"{hashlib.md5(VEHICLE_LOCATION_RULES_JSON).hexdigest()}"'
+
+
+def get_vehicle_location_rules(vehicle_status) -> MappingProxyType:
+    """Return the location rules for a vehicle status, or an empty mapping."""
+    return _LOCATION_RULES_BY_STATUS.get(vehicle_status, _NO_LOCATION_RULES)
+
+
+# Relations read by format_vehicle_details
+_VEHICLE_DETAIL_OPTIONS = (
+    joinedload(Vehicle.vehicle_entity),
+    joinedload(Vehicle.dealer),
+    joinedload(Vehicle.medallions),
+    selectinload(Vehicle.registrations),
+)
+
+
+def _get_vehicle_and_case_entity(db: Session, case_no: str, vehicle_id=None):
+    """
+    Fetch the vehicle and the case entity of a case in one query. With a
+    vehicle_id the vehicle is looked up directly, otherwise it is the vehicle
+    the case entity points to. Either side may be None.
+    """
+    if vehicle_id:
+        stmt = (
+            select(Vehicle, CaseEntity)
+            .outerjoin(CaseEntity, CaseEntity.case_no == case_no)
+            .where(Vehicle.id == vehicle_id)
+        )
+    else:
+        stmt = (
+            select(Vehicle, CaseEntity)
+            .select_from(CaseEntity)
+            .outerjoin(Vehicle, Vehicle.id == cast(CaseEntity.identifier_value, Integer))
+            .where(CaseEntity.case_no == case_no)
+        )
+    row = db.execute(stmt.options(*_VEHICLE_DETAIL_OPTIONS).limit(1)).first()
+    if not row:
+        return None, None
+    return row[0], row[1]
+
 
 @step(step_id="224", name="Fetch - Vehicle Info", operation="fetch")
 def fetch_vehicle_info(db: Session, case_no, case_params=None):
@@ -63,23 +131,16 @@ def fetch_vehicle_info(db: Session, case_no, case_params=None):
     Fetch the vehicle info along with location rules
     """
     try:
-        case_entity = bpm_service.get_case_entity(db, case_no=case_no)
-        vehicle = None
-
-        # Fetch vehicle
+        # Fetch vehicle and case entity together
+        vehicle_id = None
         if case_params and case_params.get("object_name") == "vehicle":
-            vehicle = vehicle_service.get_vehicles(
-                db, vehicle_id=case_params.get("object_lookup")
-            )
-        elif case_entity:
-            vehicle = vehicle_service.get_vehicles(
-                db, vehicle_id=int(case_entity.identifier_value)
-            )
+            vehicle_id = case_params.get("object_lookup")
+        vehicle, case_entity = _get_vehicle_and_case_entity(db, case_no, vehicle_id)
 
         if not vehicle:
             return {}
 
-        # Create case entity if missing
+        # Create case entity if missing; the INSERT goes out with the request's commit
         if not case_entity:
             bpm_service.create_case_entity(
                 db=db,
@@ -87,6 +148,7 @@ def fetch_vehicle_info(db: Session, case_no, case_params=None):
                 entity_name=entity_mapper["VEHICLE"],
                 identifier=entity_mapper["VEHICLE_IDENTIFIER"],
                 identifier_value=vehicle.id,
+                flush=False,
             )
 
         vehicle_details = format_vehicle_details(vehicle)
@@ -96,7 +158,7 @@ def fetch_vehicle_info(db: Session, case_no, case_params=None):
             "comment": vehicle.comment_for_location_change,
         }
 
-        allowed_locations = VEHICLE_LOCATION_RULES.get(vehicle.vehicle_status, {})
+        allowed_locations = get_vehicle_location_rules(vehicle.vehicle_status)
 
         return {
             "vehicle_details": vehicle_details,
@@ -155,21 +217,19 @@ def update_vehicle_info(db: Session, case_no, step_data):
             "id": vehicle.id,
             "current_location": new_location,
             "comment_for_location_change": step_data.get("comment", None),
-            "location_changed_date": datetime.utcnow().date(),
+            "location_changed_date": date.today(),
         }
 
         vehicle_service.upsert_vehicle(db=db, vehicle_data=new_location_data)
 
         audit_comment = f"Vehicle vin {vehicle.vin} location changed from ({past_location}) to ({new_location}). Comment: {step_data.get('comment', '')}"
 
-        case = bpm_service.get_cases(db=db, case_no=case_no)
-        if case:
-            audit_trail_service.create_audit_trail(
-                db=db,
-                case=case,
-                description=audit_comment,
-                meta_data={"vehicle_id": vehicle.id},
-            )
+        audit_trail_service.create_audit_trail_for_case_no(
+            db=db,
+            case_no=case_no,
+            description=audit_comment,
+            meta_data={"vehicle_id": vehicle.id},
+        )
 
         return "Ok"
     except Exception as e:
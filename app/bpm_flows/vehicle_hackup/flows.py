@@ -2,6 +2,7 @@
 
 # Standard library imports
 from datetime import datetime, timedelta
+from types import MappingProxyType
 
 from app.audit_trail.services import audit_trail_service
 from app.bpm.services import bpm_service
@@ -14,7 +15,7 @@ from app.medallions.services import medallion_service
 from app.medallions.utils import format_medallion_response
 from app.uploads.services import upload_service
 from app.vehicles.schemas import HackupStatus, RegistrationStatus, VehicleStatus , ProcessStatusEnum , ExpensesAndComplianceSubType , ExpensesAndComplianceCategory
-from app.vehicles.services import vehicle_service
+from app.vehicles.services import HACKUP_TASK_RELATIONSHIPS, VEHICLE_DETAIL_COLUMNS, vehicle_service
 from app.bpm_flows.allocate_medallion_vehicle.utils import format_vehicle_details
 
 logger = get_logger(__name__)
@@ -23,6 +24,47 @@ entity_mapper = {
     "VEHICLE_IDENTIFIER": "id",
 }
 
+# Many-to-one relationships read by format_vehicle_details and the medallion details
+VEHICLE_DETAIL_RELATIONSHIPS = ["medallions", "vehicle_entity", "dealer"]
+
+# Step 126 input fields, in the order they are unpacked by the process step
+ADDITIONAL_HACKUP_FIELDS = (
+    "plate_number",
+    "meter_serial_number",
+    "lib_insurance_number",
+    "lib_insurance_start_date",
+    "lib_insurance_end_date",
+    "wc_insurance_number",
+    "wc_insurance_start_date",
+    "wc_insurance_end_date",
+)
+
+# Read-only placeholder returned for hackup tasks that have not been created
+NOT_HACKUP_TASK = MappingProxyType({
+    "drop_location": None,
+    "drop_by": None,
+    "completed_by": None,
+    "drop_date" : None,
+    "completed_date": None,
+    "status": ProcessStatusEnum.pending ,
+    "note": None,
+    "is_task_done": False,
+    "is_required": False
+})
+
+
+def format_medallion_details(medallion):
+    """
+    Format the medallion summary shown with the vehicle details
+    """
+    if not medallion:
+        return {"medallion_number": None, "medallion_type": None, "medallion_status": None}
+    return {
+        "medallion_number": medallion.medallion_number,
+        "medallion_type": medallion.medallion_type,
+        "medallion_status": medallion.medallion_status,
+    }
+
 
 @step(step_id="125", name="Fetch - vehicle hackup details", operation="fetch")
 def fetch_vehicle_hackup_information(db, case_no, case_params=None):
@@ -33,23 +75,24 @@ def fetch_vehicle_hackup_information(db, case_no, case_params=None):
         # Get the case entity
         case_entity = bpm_service.get_case_entity(db, case_no=case_no)
 
-        vehicle = None
-        if not vehicle :
-            if case_params and case_params.get("object_name") == "vehicle":
-                vehicle = vehicle_service.get_vehicles(db=db, vehicle_id=case_params.get("object_lookup"))
-            if case_entity:
-                vehicle = vehicle_service.get_vehicles(db=db, vehicle_id=int(case_entity.identifier_value))
+        # The case entity takes precedence over the case params
+        if case_entity:
+            vehicle_id = int(case_entity.identifier_value)
+        elif case_params and case_params.get("object_name") == "vehicle":
+            vehicle_id = case_params.get("object_lookup")
+        else:
+            return {}
 
+        vehicle = vehicle_service.get_vehicles(
+            db=db, vehicle_id=vehicle_id, eager=VEHICLE_DETAIL_RELATIONSHIPS,
+            columns=VEHICLE_DETAIL_COLUMNS,
+        )
         if not vehicle:
             return {}
         
         vehicle_details = format_vehicle_details(vehicle)
 
-        vehicle_details["medallion_details"] = {
-            "medallion_number": vehicle.medallions.medallion_number if vehicle.medallions else None,
-            "medallion_type": vehicle.medallions.medallion_type if vehicle.medallions else None,
-            "medallion_status": vehicle.medallions.medallion_status if vehicle.medallions else None,
-        }
+        vehicle_details["medallion_details"] = format_medallion_details(vehicle.medallions)
 
 
         if not case_entity:
@@ -59,45 +102,30 @@ def fetch_vehicle_hackup_information(db, case_no, case_params=None):
                 entity_name=entity_mapper["VEHICLE"],
                 identifier=entity_mapper["VEHICLE_IDENTIFIER"],
                 identifier_value=str(vehicle.id),
+                flush=False,
             )
-            logger.info("Case entity %s created ", case_entity.id)
+            logger.info("Case entity created for case %s", case_no)
 
-        hackup = vehicle_service.get_vehicle_hackup(db=db , vehicle_id=vehicle.id)
+        hackup = vehicle_service.get_vehicle_hackup(
+            db=db , vehicle_id=vehicle.id, eager=HACKUP_TASK_RELATIONSHIPS
+        )
 
         if not hackup:
             return {
                 "vehicle_details": vehicle_details
             }
 
-        not_hackup_task = {
-            "drop_location": None,
-            "drop_by": None,
-            "completed_by": None,
-            "drop_date" : None,
-            "completed_date": None,
-            "status": ProcessStatusEnum.pending ,
-            "note": None,
-            "is_task_done": False,
-            "is_required": False
-        }
-
         hackup_data = {
-            "id":hackup.id if hackup else None,
-            "vehicle_id": hackup.vehicle_id if hackup else None,
-            "tpep_provider": hackup.tpep_provider if hackup else None,
-            "configuration_type": hackup.configuration_type if hackup else None,
-            "paint": hackup.paint_task.to_dict() if hackup and hackup.paint_task else not_hackup_task,
-            "camera": hackup.camera_task.to_dict() if hackup and hackup.camera_task else not_hackup_task,
-            "partition": hackup.partition_task.to_dict() if hackup and hackup.partition_task else not_hackup_task,
-            "meter": hackup.meter_task.to_dict() if hackup and hackup.meter_task else not_hackup_task,
-            "meter_serial_number": hackup.meter_serial_number if hackup else None,
-            "rooftop": hackup.rooftop_task.to_dict() if hackup and hackup.rooftop_task else not_hackup_task,
-            "dmv_registration": hackup.dmv_registration_task.to_dict() if hackup and hackup.dmv_registration_task else not_hackup_task,
-            "tlc_inspection": hackup.tlc_inspection_task.to_dict() if hackup and hackup.tlc_inspection_task else not_hackup_task,
-            "dealership": hackup.dealership_task.to_dict() if hackup and hackup.dealership_task else not_hackup_task,
-            "bat_garage": hackup.bat_garage_task.to_dict() if hackup and hackup.bat_garage_task else not_hackup_task,
-            "status" : hackup.status if hackup else None
+            "id": hackup.id,
+            "vehicle_id": hackup.vehicle_id,
+            "tpep_provider": hackup.tpep_provider,
+            "configuration_type": hackup.configuration_type,
+            "meter_serial_number": hackup.meter_serial_number,
+            "status": hackup.status,
         }
+        for task_relationship in HACKUP_TASK_RELATIONSHIPS:
+            task = getattr(hackup, task_relationship)
+            hackup_data[task_relationship.removesuffix("_task")] = task.to_dict() if task else NOT_HACKUP_TASK
         
         return {
             "vehicle_details": vehicle_details,
@@ -127,7 +155,8 @@ def process_vehicle_hackup_details(db, case_no, step_data):
         if vehicle.vehicle_status not in required_status or not vehicle.medallions:
             raise ValueError( f"Vehicle must be {VehicleStatus.AVAILABLE_FOR_HACK_UP.value} or {VehicleStatus.HACK_UP_IN_PROGRESS.value} and have a medallion")
         
-        vehicle_hackup = vehicle_service.get_vehicle_hackup(db=db , vehicle_id=vehicle.id)
+        # Lock the hackup so concurrent submissions cannot overwrite each other's tasks
+        vehicle_hackup = vehicle_service.get_vehicle_hackup(db=db , vehicle_id=vehicle.id, for_update=True)
 
         hackup_data = {
             "id":vehicle_hackup.id if vehicle_hackup else None,
@@ -145,19 +174,17 @@ def process_vehicle_hackup_details(db, case_no, step_data):
         }
 
         tasks =  step_data.get("tasks" , {})
-        for key , value in tasks.items():
-            if value:
-                existing_task_id = getattr(vehicle_hackup, f"{key}_task_id", None) if vehicle_hackup else None
-        
-                task = vehicle_service.upsert_hackup_tasks(
-                    db=db,
-                    hackup_tasks={
-                        "id": existing_task_id,
-                        "task_name" : key,
-                        **value
-                        }
-                )
-                hackup_data[f"{key}_task_id"] = task.id if task else None
+        task_payloads = [
+            {
+                "id": getattr(vehicle_hackup, f"{key}_task_id", None) if vehicle_hackup else None,
+                "task_name" : key,
+                **value
+            }
+            for key , value in tasks.items() if value
+        ]
+        upserted_tasks = vehicle_service.bulk_upsert_hackup_tasks(db=db, hackup_tasks=task_payloads)
+        for key , task in upserted_tasks.items():
+            hackup_data[f"{key}_task_id"] = task.id
 
         vehicle_hackup = vehicle_service.upsert_vehicle_hackup(db=db, vehicle_hackup_data=hackup_data)
 
@@ -168,14 +195,12 @@ def process_vehicle_hackup_details(db, case_no, step_data):
             }
         )
 
-        case = bpm_service.get_cases(db=db , case_no= case_no)
-        if case:
-            audit_trail_service.create_audit_trail(
-                db=db,
-                case=case,
-                description=f"Processed HackUp Details For vehicle {vehicle.vin} with status {vehicle.vehicle_status}",
-                meta_data={"vehicle_id": vehicle.id , "medallion_id": vehicle.medallion_id if vehicle.medallion_id else None}
-            )
+        audit_trail_service.create_audit_trail_for_case_no(
+            db=db,
+            case_no=case_no,
+            description=f"Processed HackUp Details For vehicle {vehicle.vin} with status {vehicle.vehicle_status}",
+            meta_data={"vehicle_id": vehicle.id , "medallion_id": vehicle.medallion_id if vehicle.medallion_id else None}
+        )
 
         return "Ok"
     except Exception as e:
@@ -192,32 +217,40 @@ def fetch_additional_hackup_information(db, case_no, case_params=None):
         case_entity = bpm_service.get_case_entity(db, case_no=case_no)
 
         if case_entity:
-            vehicle = vehicle_service.get_vehicles(db=db , vehicle_id=case_entity.identifier_value)
+            vehicle = vehicle_service.get_vehicles(
+                db=db , vehicle_id=case_entity.identifier_value,
+                eager=VEHICLE_DETAIL_RELATIONSHIPS + ["registrations"],
+                columns=VEHICLE_DETAIL_COLUMNS,
+            )
         
         if not vehicle:
             return {}
         
         vehicle_details = format_vehicle_details(vehicle)
-        vehicle_details["medallion_details"] = {
-            "medallion_number": vehicle.medallions.medallion_number if vehicle.medallions else None,
-            "medallion_type": vehicle.medallions.medallion_type if vehicle.medallions else None,
-            "medallion_status": vehicle.medallions.medallion_status if vehicle.medallions else None,
-        }
+        vehicle_details["medallion_details"] = format_medallion_details(vehicle.medallions)
 
         vehicle_hackup = vehicle_service.get_vehicle_hackup(db=db , vehicle_id=vehicle.id)
-        vehicle_registration = vehicle_service.get_vehicle_registration(db=db , vehicle_id=vehicle.id)
 
         if not vehicle_hackup:
             return {
                 "vehicle_details": vehicle_details
             }
-        
-        liability_insurance = vehicle_service.get_vehicle_insurance(
-            db=db, vehicle_id=vehicle.id, insurance_type=ExpensesAndComplianceSubType.Liability_Insurance.value
+
+        # Registrations were loaded with the vehicle, so pick the latest in memory
+        vehicle_registration = max(
+            vehicle.registrations, key=lambda registration: registration.created_on, default=None
         )
-        worker_compensation_insurance = vehicle_service.get_vehicle_insurance(
-            db=db, vehicle_id=vehicle.id, insurance_type=ExpensesAndComplianceSubType.Worker_Compensation_Insurance.value
+        
+        insurances = vehicle_service.get_vehicle_insurances(
+            db=db,
+            vehicle_id=vehicle.id,
+            insurance_types=[
+                ExpensesAndComplianceSubType.Liability_Insurance.value,
+                ExpensesAndComplianceSubType.Worker_Compensation_Insurance.value,
+            ],
         )
+        liability_insurance = insurances.get(ExpensesAndComplianceSubType.Liability_Insurance.value)
+        worker_compensation_insurance = insurances.get(ExpensesAndComplianceSubType.Worker_Compensation_Insurance.value)
 
         additional_details = {
             "plate_number": vehicle_registration.plate_number if vehicle_registration else None,
@@ -257,35 +290,41 @@ def process_additional_hackup_information(db, case_no, step_data):
         vehicle_hackup = vehicle_service.get_vehicle_hackup(db=db , vehicle_id=vehicle.id)
         vehicle_registraion = vehicle_service.get_vehicle_registration(db=db , vehicle_id=vehicle.id)
 
-        plate_number = step_data.get("plate_number" , None)
-        meter_serial_number = step_data.get("meter_serial_number" , None)
-        lib_insurance_number = step_data.get("lib_insurance_number" , None)
-        lib_insurance_start_date = step_data.get("lib_insurance_start_date" , None)
-        lib_insurance_end_date = step_data.get("lib_insurance_end_date" , None)
-        wc_insurance_number = step_data.get("wc_insurance_number" , None)
-        wc_insurance_start_date = step_data.get("wc_insurance_start_date" , None)
-        wc_insurance_end_date = step_data.get("wc_insurance_end_date" , None)
-
-        is_plate_number = vehicle_service.get_vehicles(db=db , plate_number=plate_number)
-        is_meter_serial_number = vehicle_service.get_vehicles(db=db , meter_serial_number=meter_serial_number)
-        is_lib_insurance_number = vehicle_service.get_vehicles(db=db , insurance_number=lib_insurance_number)
-        is_wc_insurance_number = vehicle_service.get_vehicles(db=db , insurance_number=wc_insurance_number)
-
-        if is_plate_number and is_plate_number.id != vehicle.id:
+        (
+            plate_number,
+            meter_serial_number,
+            lib_insurance_number,
+            lib_insurance_start_date,
+            lib_insurance_end_date,
+            wc_insurance_number,
+            wc_insurance_start_date,
+            wc_insurance_end_date,
+        ) = (step_data.get(field) for field in ADDITIONAL_HACKUP_FIELDS)
+
+        conflicts = vehicle_service.find_vehicles_by_any(
+            db=db,
+            plate_number=plate_number,
+            meter_serial_number=meter_serial_number,
+            lib_insurance_number=lib_insurance_number,
+            wc_insurance_number=wc_insurance_number,
+            exclude_vehicle_id=vehicle.id,
+        )
+
+        if ("plate_number", plate_number) in conflicts:
             raise ValueError(
-                f"Plate number '{plate_number}' is already registered under vehicle VIN {is_plate_number.vin}."
+                f"Plate number '{plate_number}' is already registered under vehicle VIN {conflicts[('plate_number', plate_number)][1]}."
             )
-        if is_meter_serial_number and is_meter_serial_number.id != vehicle.id:
+        if ("meter_serial_number", meter_serial_number) in conflicts:
             raise ValueError(
-                f"Meter serial number '{meter_serial_number}' is already linked to vehicle VIN {is_meter_serial_number.vin}."
+                f"Meter serial number '{meter_serial_number}' is already linked to vehicle VIN {conflicts[('meter_serial_number', meter_serial_number)][1]}."
             )
-        if is_lib_insurance_number and is_lib_insurance_number.id != vehicle.id:
+        if ("insurance_number", lib_insurance_number) in conflicts:
             raise ValueError(
-                f"Insurance number '{lib_insurance_number}' is already associated with vehicle VIN {lib_insurance_number.vin}."
+                f"Insurance number '{lib_insurance_number}' is already associated with vehicle VIN {conflicts[('insurance_number', lib_insurance_number)][1]}."
             )
-        if is_wc_insurance_number and is_wc_insurance_number.id != vehicle.id:
+        if ("insurance_number", wc_insurance_number) in conflicts:
             raise ValueError(
-                f"Insurance number '{wc_insurance_number}' is already associated with vehicle VIN {wc_insurance_number.vin}."
+                f"Insurance number '{wc_insurance_number}' is already associated with vehicle VIN {conflicts[('insurance_number', wc_insurance_number)][1]}."
             )
         
         
@@ -295,16 +334,18 @@ def process_additional_hackup_information(db, case_no, step_data):
             raise ValueError("Worker Compensation Insurance start date must be before insurance end date.")
         
 
+        today = datetime.now().date()
         registration = vehicle_service.upsert_registration(
             db=db,
             registration_data={
                 "id": vehicle_registraion.id if vehicle_registraion else None,
                 "vehicle_id": vehicle.id,
-                "registration_date": datetime.now().date(),
-                "registration_expiry_date": datetime.now().date() + timedelta(days=365),
+                "registration_date": today,
+                "registration_expiry_date": today + timedelta(days=365),
                 "plate_number": plate_number,
                 "status": RegistrationStatus.ACTIVE
-            }
+            },
+            flush=False,
         )
 
         additional_hackup = vehicle_service.upsert_vehicle_hackup(
@@ -313,7 +354,9 @@ def process_additional_hackup_information(db, case_no, step_data):
                 "id": vehicle_hackup.id if vehicle_hackup else None,
                 "meter_serial_number": meter_serial_number,
                 "status": HackupStatus.ACTIVE
-            })
+            },
+            flush=False,
+        )
         
         insurances = [
             {
@@ -334,8 +377,7 @@ def process_additional_hackup_information(db, case_no, step_data):
             }
         ]
 
-        for insurance in insurances:
-            vehicle_service.upsert_vehicle_insurance(db=db , vehicle_insurance=insurance)
+        vehicle_service.bulk_insert_vehicle_insurances(db=db , vehicle_insurances=insurances)
 
         expenses = [
             {
@@ -356,29 +398,27 @@ def process_additional_hackup_information(db, case_no, step_data):
             }
         ]
 
-        for expense in expenses:
-            vehicle_service.upsert_vehicle_expenses(db=db , vehicle_expenses=expense)
+        vehicle_service.bulk_insert_vehicle_expenses(db=db , vehicle_expenses=expenses)
         
         vehicle_service.upsert_vehicle(db=db , vehicle_data={
             "id": vehicle.id,
             "vehicle_status": VehicleStatus.HACKED_UP
-        })
+        }, flush=False)
 
         medallion_service.upsert_medallion(
             db=db , medallion_data={
                 "id": vehicle.medallion_id,
                 "medallion_status": MedallionStatus.ACTIVE
-            }
+            },
+            flush=False,
         )
 
-        case = bpm_service.get_cases(db=db , case_no= case_no)
-        if case:
-            audit_trail_service.create_audit_trail(
-                db=db,
-                case=case,
-                description=f"Processed additional hackup information for vehicle {vehicle.vin} with status {vehicle.vehicle_status}",
-                meta_data={"vehicle_id": vehicle.id , "medallion_id": vehicle.medallion_id if vehicle.medallion_id else None}
-            )
+        audit_trail_service.create_audit_trail_for_case_no(
+            db=db,
+            case_no=case_no,
+            description=f"Processed additional hackup information for vehicle {vehicle.vin} with status {vehicle.vehicle_status}",
+            meta_data={"vehicle_id": vehicle.id , "medallion_id": vehicle.medallion_id if vehicle.medallion_id else None}
+        )
 
         return "Ok"
     except Exception as e:
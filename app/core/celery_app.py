@@ -32,6 +32,7 @@ app.autodiscover_tasks(
         "app.repairs",
         "app.tlc",
         "app.drivers",
+        "app.interim_payments",
     ]
 )
 
@@ -2,15 +2,30 @@
 
 import json
 import os
-from functools import lru_cache
+import time
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
 import boto3
+from pydantic import Field, PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from app.utils.logger import get_logger
 
+# Secret payloads are parsed with orjson when it is installed
+try:
+    from orjson import loads as _loads_secret
+except ImportError:
+    _loads_secret = json.loads
+
+# Secrets are refreshed after rotation when aws-secretsmanager-caching is installed
+try:
+    from aws_secretsmanager_caching import SecretCache, SecretCacheConfig
+except ImportError:
+    SecretCache = None
+
 logger = get_logger(__name__)
 
 
@@ -21,25 +36,115 @@ logger = get_logger(__name__)
 #
 
 
+@lru_cache(maxsize=4)
+def _secrets_manager_client(region: str):
+    """
+    Build one Secrets Manager client per region and reuse it, since
+    creating a boto3 client loads the botocore service model.
+    """
+    return boto3.client("secretsmanager", region_name=region)
+
+
+# How long a secret is served from the SecretCache before it is fetched again
+SECRET_REFRESH_INTERVAL_SECONDS = 300
+
+
+@lru_cache(maxsize=4)
+def _secret_cache(region: str):
+    """
+    Build one SecretCache per region. It refreshes each cached secret every
+    SECRET_REFRESH_INTERVAL_SECONDS so rotated credentials are picked up.
+    """
+    return SecretCache(
+        config=SecretCacheConfig(
+            secret_refresh_interval=SECRET_REFRESH_INTERVAL_SECONDS,
+            max_cache_size=16,
+        ),
+        client=_secrets_manager_client(region),
+    )
+
+
 @lru_cache(maxsize=32)
+def _parse_secret_string(secret_string: str) -> dict:
+    """Parse a secret payload once per distinct secret version."""
+    return _loads_secret(secret_string)
+
+
+# Secret values loaded up front by prefetch_secret_values, keyed by (secret_id, region)
+_prefetched_secrets: dict[tuple[str, str], dict] = {}
+
+
+def prefetch_secret_values(secret_ids: list[str | None], region: str | None) -> None:
+    """
+    Load several secrets with a single BatchGetSecretValue call so that the
+    first cached_secret_values lookup of each does not need its own round trip.
+    Any secret missing from the batch is fetched on its own as before.
+    Skipped when the SecretCache is available, since it owns caching and refresh.
+    """
+    if SecretCache is not None:
+        return
+
+    secret_ids = list(dict.fromkeys(
+        secret_id for secret_id in secret_ids if secret_id and secret_id.strip()
+    ))
+    if not secret_ids:
+        return
+
+    region = region or os.getenv("AWS_REGION", "us-east-1")
+    try:
+        client = _secrets_manager_client(region)
+        paginator = client.get_paginator("batch_get_secret_value")
+        for page in paginator.paginate(SecretIdList=secret_ids):
+            for secret in page.get("SecretValues", []):
+                for secret_id in (secret.get("Name"), secret.get("ARN")):
+                    if secret_id in secret_ids:
+                        _prefetched_secrets[(secret_id, region)] = _loads_secret(
+                            secret["SecretString"]
+                        )
+            for error in page.get("Errors", []):
+                logger.warning(
+                    "Secret not prefetched",
+                    secret_id=error.get("SecretId"),
+                    error=error.get("Message"),
+                )
+        logger.info("Prefetched secrets from Secrets Manager", count=len(secret_ids))
+    except Exception as e:
+        logger.warning("Failed to prefetch secrets", error=str(e))
+
+
 def cached_secret_values(secret_id: str | None, region: str | None) -> dict:
     """
     Load arbitrary secret from AWS Secrets Manager.
     Returns {} if secret_id is not set or is an empty string.
 
-    Because of @lru_cache, each unique (secret_id, region) pair is fetched
-    only once per application start.
+    With aws-secretsmanager-caching installed, secrets are served from a
+    SecretCache and refreshed every SECRET_REFRESH_INTERVAL_SECONDS.
+    Otherwise each unique (secret_id, region) pair is fetched only once
+    per application start.
     """
     # Handle both None and empty string cases
     if not secret_id or secret_id.strip() == "":
         return {}
 
     region = region or os.getenv("AWS_REGION", "us-east-1")
+    if SecretCache is not None:
+        return _parse_secret_string(
+            _secret_cache(region).get_secret_string(secret_id)
+        )
+    return _load_secret_values(secret_id, region)
+
+
+@lru_cache(maxsize=32)
+def _load_secret_values(secret_id: str, region: str) -> dict:
+    """Fetch and parse a secret once, using the prefetched value when present."""
+    if (secret_id, region) in _prefetched_secrets:
+        return _prefetched_secrets.pop((secret_id, region))
+
     logger.info("Loading secret", secret_id=secret_id, region=region)
 
-    client = boto3.client("secretsmanager", region_name=region)
+    client = _secrets_manager_client(region)
     resp = client.get_secret_value(SecretId=secret_id)
-    data = json.loads(resp["SecretString"])
+    data = _loads_secret(resp["SecretString"])
 
     logger.info("Loaded secret from Secrets Manager", secret_id=secret_id)
     return data
@@ -51,14 +156,19 @@ def cached_secret_values(secret_id: str | None, region: str | None) -> dict:
 # =====================================================
 #
 
+# Shared read-only default for mapping settings that are not configured
+_EMPTY_MAPPING = MappingProxyType({})
+
 
 class Settings(BaseSettings):
     """
     Application Settings
     """
 
+    # Frozen so the secret-derived values cached on the instance cannot go
+    # stale through a field assignment; use reload_secrets() after a rotation
     model_config = SettingsConfigDict(
-        env_file=".env", extra="ignore", case_sensitive=False
+        env_file=".env", extra="ignore", case_sensitive=False, frozen=True
     )
 
     pythonpath: str
@@ -80,7 +190,7 @@ class Settings(BaseSettings):
 
     # Redis base fields (for .env / local)
     redis_host: str
-    redis_port: str
+    redis_port: int = 6379
     redis_username: Optional[str] = None
     redis_password: Optional[str] = None
 
@@ -102,7 +212,6 @@ class Settings(BaseSettings):
 
     aws_sns_sender_id: str = None
     aws_ses_sender_email: str = None
-    aws_ses_configuration_set: str = None
     aws_admin_email: str = None
     s3_bucket_name: str = None
 
@@ -121,10 +230,6 @@ class Settings(BaseSettings):
     # When set, ALL SMS will go to this phone number instead of actual recipients
     override_sms_to: str = None  # e.g., "+11234567890"
 
-    # SMS override recipient (E.164 format)
-    # When set, ALL SMS will go to this phone number instead of actual recipients
-    override_sms_to: str = None  # e.g., "+11234567890"
-
     claude_model_id: str = None
     app_base_url: str = None
 
@@ -201,7 +306,9 @@ class Settings(BaseSettings):
     lease_deposit_release_days: Optional[int] = 30
     lease_termination_reasons: str = ""
     lease_6_months: int = 0
-    day_name_to_num: dict = {}
+    day_name_to_num: Mapping[str, int] = Field(
+        default_factory=lambda: _EMPTY_MAPPING
+    )
     full_time_drivers: str = ""
     day_shift_drivers: str = ""
     night_shift_drivers: str = ""
@@ -242,29 +349,92 @@ class Settings(BaseSettings):
     lease_creation_welcome_subject_template: str
 
     events_config_path: str
-    driver_license_expiry_email_template: str
-    driver_license_expiry_sms_template: str
-
-    lease_creation_welcome_template: str
-    lease_creation_welcome_subject_template: str
 
     # Password reset email configuration
     password_reset_email_template_key: str = None
     password_reset_email_subject_template: str = None
 
+    # Secret payloads, resolved together when the settings are created
+    _db_secret: dict = PrivateAttr(default_factory=dict)
+    _redis_secret: dict = PrivateAttr(default_factory=dict)
+    _aws_credentials_secret: dict = PrivateAttr(default_factory=dict)
+    # (monotonic load time, payload) of the DocuSign secret
+    _docusign_secret: Optional[tuple[float, dict]] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._resolve_secrets()
+        # Read the version file at startup rather than on the first request
+        self.app_version
+
+    def _resolve_secrets(self) -> None:
+        """
+        Load the DB, Redis, AWS credentials and DocuSign secrets up front, with
+        one batch call where possible. The lookups run one after another: this
+        happens at import time, and the boto3 default session used to build
+        the shared client and SecretCache is not thread-safe.
+        The DocuSign secret is memoised by docusign_secret and re-read once
+        SECRET_REFRESH_INTERVAL_SECONDS have passed.
+        """
+        secret_ids = [
+            self.db_secret_id,
+            self.redis_secret_id,
+            self.aws_credentials_secret_id,
+            self.docusign_secret_id,
+        ]
+        prefetch_secret_values(secret_ids, self.aws_region)
+        (
+            self._db_secret,
+            self._redis_secret,
+            self._aws_credentials_secret,
+            docusign_secret,
+        ) = (cached_secret_values(secret_id, self.aws_region) for secret_id in secret_ids)
+        self._docusign_secret = (time.monotonic(), docusign_secret)
+
+    def reload_secrets(self) -> None:
+        """
+        Fetch the secrets again after a rotation and drop the connection
+        values that were derived from the previous ones.
+        """
+        if SecretCache is None:
+            _load_secret_values.cache_clear()
+        self._resolve_secrets()
+        for name in (
+            "_db_tuple", "db_url", "async_db_url",
+            "_redis_tuple", "redis_url", "cache_manager", "celery_broker", "celery_backend",
+            "aws_access_key_id", "aws_secret_access_key",
+        ):
+            self.__dict__.pop(name, None)
+
+    @property
+    def docusign_secret(self) -> dict:
+        """
+        DocuSign secret payload. Read per DocuSign request, so the resolved
+        dict is kept and only looked up again through cached_secret_values
+        every SECRET_REFRESH_INTERVAL_SECONDS, when a rotation can show up.
+        """
+        now = time.monotonic()
+        memoised = self._docusign_secret
+        if memoised is None or now - memoised[0] >= SECRET_REFRESH_INTERVAL_SECONDS:
+            memoised = (now, cached_secret_values(self.docusign_secret_id, self.aws_region))
+            self._docusign_secret = memoised
+        return memoised[1]
+
     #
     # ---------------------------
     #  DB ACCESS PROPERTIES
     # ---------------------------
     #
-    @property
+    # Secrets and derived URLs do not change for the lifetime of the process,
+    # so they are resolved once per Settings instance with cached_property.
+    #
+    @cached_property
     def _db_tuple(self):
         """
         Resolve DB connection details:
         - If db_secret_id is set → use secret (DB_HOST, DB_USER, DB_PASSWORD, DB_DATABASE, DB_PORT)
         - Else → use .env values
         """
-        data = cached_secret_values(self.db_secret_id, self.aws_region)
+        data = self._db_secret
 
         if data:
             logger.info(
@@ -277,17 +447,17 @@ class Settings(BaseSettings):
         user = data.get("DB_USER") or self.db_user
         password = data.get("DB_PASSWORD") or self.db_password
         database = data.get("DB_DATABASE") or self.db_database
-        port = int(data.get("DB_PORT") or self.db_port)
+        port = int(data["DB_PORT"]) if data.get("DB_PORT") else self.db_port
 
         return host, user, password, database, port
 
-    @property
+    @cached_property
     def db_url(self) -> str:
         """Construct the synchronous database URL."""
         host, user, password, database, port = self._db_tuple
         return f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
 
-    @property
+    @cached_property
     def async_db_url(self) -> str:
         """Construct the asynchronous database URL."""
         host, user, password, database, port = self._db_tuple
@@ -298,14 +468,14 @@ class Settings(BaseSettings):
     #  REDIS ACCESS PROPERTIES
     # ---------------------------
     #
-    @property
+    @cached_property
     def _redis_tuple(self):
         """
         Resolve Redis connection details:
         - If redis_secret_id is set → use secret (REDIS_HOST, REDIS_PORT, REDIS_USERNAME, REDIS_PASSWORD)
         - Else → use .env values
         """
-        data = cached_secret_values(self.redis_secret_id, self.aws_region)
+        data = self._redis_secret
 
         if data:
             logger.info(
@@ -316,13 +486,13 @@ class Settings(BaseSettings):
 
         # Use explicit defaults for localhost development
         host = data.get("REDIS_HOST") or self.redis_host or "localhost"
-        port = data.get("REDIS_PORT") or self.redis_port or "6379"
+        port = int(data["REDIS_PORT"]) if data.get("REDIS_PORT") else self.redis_port
         username = data.get("REDIS_USERNAME") or self.redis_username
         password = data.get("REDIS_PASSWORD") or self.redis_password
 
         return host, port, username, password
 
-    @property
+    @cached_property
     def redis_url(self) -> str:
         """Construct the Redis URL."""
         host, port, username, password = self._redis_tuple
@@ -334,17 +504,17 @@ class Settings(BaseSettings):
         else:
             return f"redis://{host}:{port}"
 
-    @property
+    @cached_property
     def cache_manager(self) -> str:
         """Construct the Redis URL for cache manager (DB 0)."""
         return f"{self.redis_url}/0"
 
-    @property
+    @cached_property
     def celery_broker(self) -> str:
         """Construct the Redis URL for Celery broker (DB 1)."""
         return f"{self.redis_url}/1"
 
-    @property
+    @cached_property
     def celery_backend(self) -> str:
         """Construct the Redis URL for Celery backend (DB 2)."""
         return f"{self.redis_url}/2"
@@ -354,7 +524,7 @@ class Settings(BaseSettings):
     #  AWS ACCESS KEYS
     # ---------------------------
     #
-    @property
+    @cached_property
     def aws_access_key_id(self):
         """
         Resolve AWS_ACCESS_KEY_ID:
@@ -364,7 +534,7 @@ class Settings(BaseSettings):
         2. Else:
            → Use AWS_ACCESS_KEY_ID from .env / environment variables
         """
-        data = cached_secret_values(self.aws_credentials_secret_id, self.aws_region)
+        data = self._aws_credentials_secret
         if data:
             logger.info(
                 "AWS_ACCESS_KEY_ID source: Secrets Manager",
@@ -375,7 +545,7 @@ class Settings(BaseSettings):
 
         return data.get("AWS_ACCESS_KEY_ID") or self.aws_access_key_id_base
 
-    @property
+    @cached_property
     def aws_secret_access_key(self):
         """
         Resolve AWS_SECRET_ACCESS_KEY:
@@ -385,7 +555,7 @@ class Settings(BaseSettings):
         2. Else:
            → Use AWS_SECRET_ACCESS_KEY from .env / environment variables
         """
-        data = cached_secret_values(self.aws_credentials_secret_id, self.aws_region)
+        data = self._aws_credentials_secret
         if data:
             logger.info(
                 "AWS_SECRET_ACCESS_KEY source: Secrets Manager",
@@ -396,17 +566,31 @@ class Settings(BaseSettings):
 
         return data.get("AWS_SECRET_ACCESS_KEY") or self.aws_secret_access_key_base
 
+    #
+    # ---------------------------
+    #  PARSED LIST SETTINGS
+    # ---------------------------
+    #
+    @cached_property
+    def lease_termination_reason_list(self) -> tuple[str, ...]:
+        """The comma separated lease termination reasons, split once."""
+        if not self.lease_termination_reasons:
+            return ()
+        return tuple(
+            reason.strip() for reason in self.lease_termination_reasons.split(",")
+        )
+
     #
     # ---------------------------
     #  APPLICATION VERSION
     # ---------------------------
     #
-    @property
+    @cached_property
     def app_version(self) -> str:
         """
         Read application version from JSON file specified in VERSION_PATH.
         Returns '-' if file not found or error occurs.
-        This is read once and cached by the property.
+        This is read once and cached on the settings instance.
         """
         try:
             version_file = Path(self.version_path)
@@ -414,7 +598,9 @@ class Settings(BaseSettings):
                 version_data = json.loads(version_file.read_text(encoding="utf-8"))
                 version = version_data.get("version", "-")
                 logger.info(
-                    f"Application version found {version} from path {self.version_path}"
+                    "Application version found",
+                    version=version,
+                    version_path=self.version_path,
                 )
                 return version
             else:
@@ -446,14 +632,15 @@ def get_docusign_private_key_s3_key():
     - Else:
         Falls back to `docusign_private_key_s3_key` from .env
     """
-    data = cached_secret_values(settings.docusign_secret_id, settings.aws_region)
+    # Called per DocuSign request, so the source is only logged at debug level
+    data = settings.docusign_secret
     if data:
-        logger.info(
+        logger.debug(
             "DOCUSIGN_PRIVATE_KEY_S3_KEY source: Secrets Manager",
             secret_id=settings.docusign_secret_id,
         )
     else:
-        logger.info("DOCUSIGN_PRIVATE_KEY_S3_KEY source: .env / environment variables")
+        logger.debug("DOCUSIGN_PRIVATE_KEY_S3_KEY source: .env / environment variables")
     return (
         data.get("DOCUSIGN_PRIVATE_KEY_S3_KEY") or settings.docusign_private_key_s3_key
     )
@@ -1,5 +1,7 @@
 # app/core/db.py
 
+from typing import Any, Callable, Optional
+
 from fastapi import Depends
 from sqlalchemy import MetaData, create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -46,6 +48,40 @@ def get_current_user_id(db: Session) -> int:
     return db.info.get("current_user_id")
 
 
+def get_request_cache(db: Session, namespace: str) -> dict:
+    """
+    Get a cache dict scoped to the session, and therefore to the request.
+
+    Args:
+        db: SQLAlchemy session
+        namespace: Name separating unrelated caches
+
+    Returns:
+        The (possibly empty) cache dict for the namespace
+    """
+    return db.info.setdefault("request_cache", {}).setdefault(namespace, {})
+
+
+def get_request_service(
+    db: Session, service_cls: type, factory: Optional[Callable[[], Any]] = None
+):
+    """
+    Get a single instance of a session-bound service or repository per request.
+
+    Args:
+        db: SQLAlchemy session
+        service_cls: Class used as the cache key, built as service_cls(db) by default
+        factory: Optional callable building the instance when it needs other arguments
+
+    Returns:
+        The instance shared by every caller using the same session
+    """
+    services = get_request_cache(db, "services")
+    if service_cls not in services:
+        services[service_cls] = factory() if factory else service_cls(db)
+    return services[service_cls]
+
+
 # --- Event listeners for automatic audit field population ---
 @event.listens_for(Session, "before_flush")
 def before_flush(session, flush_context, instances):
@@ -12,6 +12,7 @@ This module defines the database models for CURB trip management:
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum as PyEnum
+from operator import attrgetter
 from typing import Optional
 
 from sqlalchemy import (
@@ -97,7 +98,7 @@ class CurbAccount(Base, AuditMixin):
     )
     
     # Relationships
-    trips: Mapped[list["CurbTrip"]] = relationship(back_populates="account", lazy="select")
+    trips: Mapped[list["CurbTrip"]] = relationship(back_populates="account", lazy="raise")
     
     def __repr__(self):
         return f"<CurbAccount(id={self.id}, name='{self.account_name}', active={self.is_active})>"
@@ -119,7 +120,7 @@ class CurbTrip(Base, AuditMixin):
 
     __tablename__ = "curb_trips"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     # --- Unique Identifiers from Source ---
     curb_trip_id: Mapped[str] = mapped_column(
@@ -127,22 +128,22 @@ class CurbTrip(Base, AuditMixin):
         comment="Unique identifier for the trip from CURB (e.g., ROWID).",
     )
     account_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("curb_accounts.id"), nullable=False, index=True,
+        Integer, ForeignKey("curb_accounts.id"), nullable=False,
         comment="Which CURB account this trip came from"
     )
 
     status: Mapped[CurbTripStatus] = mapped_column(
         Enum(CurbTripStatus), default=CurbTripStatus.IMPORTED, nullable=False,
-        index=True, comment="Current processing status"
+        comment="Current processing status"
     )
 
     # --- Foreign Key Associations ---
     driver_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("drivers.id"), index=True,
+        Integer, ForeignKey("drivers.id"),
         comment="Internal driver ID (mapped from curb_driver_id)"
     )
     lease_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("leases.id"), index=True,
+        Integer, ForeignKey("leases.id"),
         comment="Active lease during this trip"
     )
     vehicle_id: Mapped[Optional[int]] = mapped_column(
@@ -166,7 +167,7 @@ class CurbTrip(Base, AuditMixin):
 
     # === Trip Timestamps ===
     start_time: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, index=True,
+        DateTime(timezone=True), nullable=False,
         comment="Trip start datetime (used for 3-hour windowing)"
     )
     end_time: Mapped[datetime] = mapped_column(
@@ -176,51 +177,51 @@ class CurbTrip(Base, AuditMixin):
 
     # === Financial Data (CASH trips only) ===
     fare: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Base fare amount"
     )
     tips: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Tip amount"
     )
     tolls: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Toll charges"
     )
     extras: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Extra charges"
     )
     total_amount: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"), index=True,
+        Numeric(10, 2), nullable=False, server_default="0.00", index=True,
         comment="Total trip amount"
     )
 
     # === Tax & Fee Breakdown ===
     surcharge: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="State Surcharge (MTA Tax)"
     )
     improvement_surcharge: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Improvement Surcharge (TIF)"
     )
     congestion_fee: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Congestion Fee"
     )
     airport_fee: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Airport Fee"
     )
     cbdt_fee: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2), nullable=False, default=Decimal("0.00"),
+        Numeric(10, 2), nullable=False, server_default="0.00",
         comment="Congestion Relief Zone Toll (CBDT)"
     )
 
     # === Payment Info ===
     payment_type: Mapped[PaymentType] = mapped_column(
-        Enum(PaymentType), default=PaymentType.CASH, nullable=False, index=True,
+        Enum(PaymentType), default=PaymentType.CASH, nullable=False,
         comment="Payment method (we only import CASH)"
     )
 
@@ -276,12 +277,14 @@ class CurbTrip(Base, AuditMixin):
     )
 
     # --- Relationships ---
-    account: Mapped["CurbAccount"] = relationship(back_populates="trips", lazy="joined")
+    account: Mapped["CurbAccount"] = relationship(back_populates="trips", lazy="select")
     driver: Mapped[Optional["Driver"]] = relationship(lazy="select")
     lease: Mapped[Optional["Lease"]] = relationship(lazy="select")
     vehicle: Mapped[Optional["Vehicle"]] = relationship(lazy="select")
     medallion: Mapped[Optional["Medallion"]] = relationship(lazy="select")
 
+    # account_id, status, driver_id, lease_id, start_time and payment_type
+    # have no single-column index: each leads one of the composites below
     __table_args__ = (
         # For datetime window queries with status filtering
         Index('idx_curb_trip_time_status', 'start_time', 'status'),
@@ -298,41 +301,67 @@ class CurbTrip(Base, AuditMixin):
         # For account-based filtering
         Index('idx_curb_account_time', 'account_id', 'start_time'),
         
-        # For finding unposted trips ready for ledger
-        Index('idx_curb_ready_for_ledger', 'status', 'driver_id', 'start_time'),
+        # For finding unposted trips ready for ledger: status/date window seek,
+        # driver/lease filters checked in the index before rows are read
+        Index('idx_curb_ready_for_ledger', 'status', 'start_time', 'driver_id', 'lease_id'),
     )
 
     def to_dict(self):
         """Convert trip to dictionary for API responses"""
-        return {
-            "id": self.id,
-            "curb_trip_id": self.curb_trip_id,
-            "account_id": self.account_id,
-            "status": self.status.value,
-            "driver_id": self.driver_id,
-            "curb_driver_id": self.curb_driver_id,
-            "curb_cab_number": self.curb_cab_number,
-            "start_time": self.start_time.isoformat() if self.start_time else None,
-            "end_time": self.end_time.isoformat() if self.end_time else None,
-            "fare": float(self.fare),
-            "tips": float(self.tips),
-            "tolls": float(self.tolls),
-            "extras": float(self.extras),
-            "total_amount": float(self.total_amount),
-            "surcharge": float(self.surcharge),
-            "improvement_surcharge": float(self.improvement_surcharge),
-            "congestion_fee": float(self.congestion_fee),
-            "airport_fee": float(self.airport_fee),
-            "cbdt_fee": float(self.cbdt_fee),
-            "payment_type": self.payment_type.value,
-            "ledger_posting_ref": self.ledger_posting_ref,
-            "posted_to_ledger_at": self.posted_to_ledger_at.isoformat() if self.posted_to_ledger_at else None,
-            "transaction_date": self.transaction_date.isoformat() if self.transaction_date else None,
-            "start_lat": float(self.start_lat) if self.start_lat else None,
-            "start_long": float(self.start_long) if self.start_long else None,
-            "end_lat": float(self.end_lat) if self.end_lat else None,
-            "end_long": float(self.end_long) if self.end_long else None,
-        }
+        return {key: getter(self) for key, getter in _TRIP_DICT_FIELDS}
     
     def __repr__(self):
-        return f"<CurbTrip(id={self.id}, trip_id='{self.curb_trip_id}', status={self.status.value}, amount={self.total_amount})>"
\ No newline at end of file
+        return f"<CurbTrip(id={self.id}, trip_id='{self.curb_trip_id}', status={self.status.value}, amount={self.total_amount})>"
+
+
+def _float_of(name):
+    get = attrgetter(name)
+    return lambda trip: float(get(trip))
+
+
+def _float_or_none(name):
+    get = attrgetter(name)
+
+    def getter(trip):
+        value = get(trip)
+        return float(value) if value else None
+    return getter
+
+
+def _isoformat_or_none(name):
+    get = attrgetter(name)
+
+    def getter(trip):
+        value = get(trip)
+        return value.isoformat() if value else None
+    return getter
+
+
+def _enum_value(name):
+    get = attrgetter(name)
+    return lambda trip: get(trip).value
+
+
+# (key, getter) pairs for CurbTrip.to_dict, built once instead of per trip
+_TRIP_DICT_FIELDS = (
+    *((key, attrgetter(key)) for key in (
+        "id", "curb_trip_id", "account_id",
+    )),
+    ("status", _enum_value("status")),
+    *((key, attrgetter(key)) for key in (
+        "driver_id", "curb_driver_id", "curb_cab_number",
+    )),
+    ("start_time", _isoformat_or_none("start_time")),
+    ("end_time", _isoformat_or_none("end_time")),
+    *((key, _float_of(key)) for key in (
+        "fare", "tips", "tolls", "extras", "total_amount", "surcharge",
+        "improvement_surcharge", "congestion_fee", "airport_fee", "cbdt_fee",
+    )),
+    ("payment_type", _enum_value("payment_type")),
+    ("ledger_posting_ref", attrgetter("ledger_posting_ref")),
+    ("posted_to_ledger_at", _isoformat_or_none("posted_to_ledger_at")),
+    ("transaction_date", _isoformat_or_none("transaction_date")),
+    *((key, _float_or_none(key)) for key in (
+        "start_lat", "start_long", "end_lat", "end_long",
+    )),
+)
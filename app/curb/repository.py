@@ -13,8 +13,9 @@ from typing import List, Optional, Tuple
 from sqlalchemy import and_, func
 from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.core.db import get_current_user_id
 from app.curb.exceptions import CurbAccountNotFoundError, CurbTripNotFoundError
 from app.curb.models import CurbAccount, CurbTrip, CurbTripStatus, PaymentType
 from app.drivers.models import Driver
@@ -26,6 +27,16 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Trips sent per INSERT ... ON DUPLICATE KEY UPDATE statement
+TRIP_UPSERT_BATCH_SIZE = 500
+
+# Columns a re-import must not overwrite: identity/audit fields, and the
+# ledger state so an already posted trip is not reset to IMPORTED
+_TRIP_UPSERT_PRESERVED_COLUMNS = frozenset({
+    "id", "curb_trip_id", "created_on", "created_by",
+    "status", "posted_to_ledger_at", "ledger_posting_ref",
+})
+
 
 class CurbRepository:
     """Data Access Layer for CURB operations"""
@@ -81,7 +92,9 @@ class CurbRepository:
 
     def bulk_insert_or_update_trips(self, trips_data: List[dict]) -> Tuple[int, int]:
         """
-        Insert/update trips individually with savepoints (like EZPass pattern)
+        Insert/update trips in batches with INSERT ... ON DUPLICATE KEY UPDATE.
+        A batch that fails is retried trip by trip with savepoints (like the
+        EZPass pattern) so one bad record does not drop the rest.
         
         Args:
             trips_data: List of trip dictionaries
@@ -104,17 +117,81 @@ class CurbRepository:
         if not trips_to_process:
             return 0, 0
         
-        logger.info(f"Processing {len(trips_to_process)} CURB trips individually")
+        logger.info(f"Processing {len(trips_to_process)} CURB trips in batches of {TRIP_UPSERT_BATCH_SIZE}")
         
         inserted_count = 0
         updated_count = 0
         failed_count = 0
         
-        for i, trip_data in enumerate(trips_to_process, 1):
+        for offset in range(0, len(trips_to_process), TRIP_UPSERT_BATCH_SIZE):
+            batch = trips_to_process[offset:offset + TRIP_UPSERT_BATCH_SIZE]
+            savepoint = self.db.begin_nested()
+            try:
+                inserted, updated = self._upsert_trip_batch(batch)
+                savepoint.commit()
+                inserted_count += inserted
+                updated_count += updated
+            except Exception as e:
+                savepoint.rollback()
+                logger.warning(f"Batch upsert of {len(batch)} trips failed, retrying individually: {e}")
+                inserted, updated, failed = self._upsert_trips_individually(batch)
+                inserted_count += inserted
+                updated_count += updated
+                failed_count += failed
+            
+            logger.info(
+                f"Processed {min(offset + TRIP_UPSERT_BATCH_SIZE, len(trips_to_process))}/{len(trips_to_process)} trips "
+                f"(inserted: {inserted_count}, updated: {updated_count})"
+            )
+        
+        logger.info(
+            f"Completed: {inserted_count} inserted, {updated_count} updated, "
+            f"{failed_count} failed out of {len(trips_to_process)} total"
+        )
+        
+        return inserted_count, updated_count
+
+    def _upsert_trip_batch(self, batch: List[dict]) -> Tuple[int, int]:
+        """
+        Upsert a batch of trips with one multi-row statement per distinct set of
+        keys. Existing trips are counted up front with a single IN query.
+        """
+        existing_ids = {
+            curb_trip_id for (curb_trip_id,) in self.db.query(CurbTrip.curb_trip_id).filter(
+                CurbTrip.curb_trip_id.in_([trip["curb_trip_id"] for trip in batch])
+            )
+        }
+        
+        # Core inserts skip the before_flush hook, so set created_by here
+        user_id = get_current_user_id(self.db)
+        rows_by_keys = {}
+        for trip in batch:
+            row = {"created_by": user_id, **trip}
+            rows_by_keys.setdefault(tuple(row), []).append(row)
+        
+        for keys, rows in rows_by_keys.items():
+            stmt = insert(CurbTrip)
+            update_columns = {
+                key: stmt.inserted[key]
+                for key in keys
+                if key not in _TRIP_UPSERT_PRESERVED_COLUMNS
+            }
+            update_columns["updated_on"] = func.now()
+            self.db.execute(stmt.on_duplicate_key_update(update_columns), rows)
+        
+        updated = len(existing_ids)
+        return len(batch) - updated, updated
+
+    def _upsert_trips_individually(self, trips: List[dict]) -> Tuple[int, int, int]:
+        """Insert/update trips one at a time, each in its own savepoint."""
+        inserted_count = 0
+        updated_count = 0
+        failed_count = 0
+        
+        for trip_data in trips:
+            # Use savepoint for each trip
+            savepoint = self.db.begin_nested()
             try:
-                # Use savepoint for each trip
-                savepoint = self.db.begin_nested()
-                
                 # Check if trip already exists
                 existing_trip = self.db.query(CurbTrip).filter(
                     CurbTrip.curb_trip_id == trip_data['curb_trip_id']
@@ -123,7 +200,7 @@ class CurbRepository:
                 if existing_trip:
                     # Update existing trip
                     for key, value in trip_data.items():
-                        if hasattr(existing_trip, key) and key not in ['id', 'created_on']:
+                        if hasattr(existing_trip, key) and key not in _TRIP_UPSERT_PRESERVED_COLUMNS:
                             setattr(existing_trip, key, value)
                     existing_trip.updated_on = datetime.now()
                     updated_count += 1
@@ -139,10 +216,6 @@ class CurbRepository:
                 # Commit the savepoint if successful
                 savepoint.commit()
                 
-                # Log progress every 100 trips
-                if i % 100 == 0:
-                    logger.info(f"Processed {i}/{len(trips_to_process)} trips (inserted: {inserted_count}, updated: {updated_count})")
-                
             except Exception as e:
                 # Rollback only this savepoint
                 savepoint.rollback()
@@ -155,12 +228,7 @@ class CurbRepository:
                 
                 continue
         
-        logger.info(
-            f"Completed: {inserted_count} inserted, {updated_count} updated, "
-            f"{failed_count} failed out of {len(trips_to_process)} total"
-        )
-        
-        return inserted_count, updated_count
+        return inserted_count, updated_count, failed_count
 
     # --- CURB TRIP QUERY OPERATIONS --- #
 
@@ -260,7 +328,7 @@ class CurbRepository:
         Returns (trips, total_count)
         """
         query = self.db.query(CurbTrip).options(
-            joinedload(CurbTrip.account),
+            selectinload(CurbTrip.account),
             joinedload(CurbTrip.driver),
             joinedload(CurbTrip.lease),
         )
@@ -344,35 +412,63 @@ class CurbRepository:
 
     def get_account_statistics(self, account_id: int) -> dict:
         """Get statistics for a specific CURB account"""
-        stats = self.db.query(
+        return self.get_statistics_by_account([account_id])[account_id]
+    
+    def get_statistics_by_account(self, account_ids: List[int]) -> dict:
+        """
+        Get statistics for several CURB accounts in one grouped query.
+        Returns {account_id: stats}; accounts without trips get zeroed stats.
+        """
+        statistics = {
+            account_id: {
+                "total_trips": 0,
+                "trips_imported": 0,
+                "trips_posted": 0,
+                "total_earnings": Decimal("0.00"),
+                "last_import": None,
+            }
+            for account_id in account_ids
+        }
+        if not account_ids:
+            return statistics
+        
+        rows = self.db.query(
+            CurbTrip.account_id,
             func.count(CurbTrip.id).label("total_trips"),
             func.count(func.nullif(CurbTrip.status == CurbTripStatus.IMPORTED, False)).label("trips_imported"),
             func.count(func.nullif(CurbTrip.status == CurbTripStatus.POSTED_TO_LEDGER, False)).label("trips_posted"),
             func.sum(CurbTrip.total_amount).label("total_earnings"),
             func.max(CurbTrip.created_on).label("last_import")
         ).filter(
-            CurbTrip.account_id == account_id
-        ).first()
-        
-        return {
-            "total_trips": stats.total_trips or 0,
-            "trips_imported": stats.trips_imported or 0,
-            "trips_posted": stats.trips_posted or 0,
-            "total_earnings": stats.total_earnings or Decimal("0.00"),
-            "last_import": stats.last_import,
-        }
+            CurbTrip.account_id.in_(account_ids)
+        ).group_by(CurbTrip.account_id)
+        
+        for stats in rows:
+            statistics[stats.account_id] = {
+                "total_trips": stats.total_trips or 0,
+                "trips_imported": stats.trips_imported or 0,
+                "trips_posted": stats.trips_posted or 0,
+                "total_earnings": stats.total_earnings or Decimal("0.00"),
+                "last_import": stats.last_import,
+            }
+        
+        return statistics
     
     def get_system_statistics(self) -> dict:
         """Get overall CURB system statistics"""
+        accounts = self.db.query(
+            func.count(CurbAccount.id).label("total_accounts"),
+            func.count(func.nullif(CurbAccount.is_active == True, False)).label("active_accounts"),
+        ).one()
+        trips = self.db.query(
+            func.count(CurbTrip.id).label("total_trips"),
+            func.count(func.nullif(CurbTrip.status == CurbTripStatus.IMPORTED, False)).label("trips_pending_post"),
+        ).one()
         return {
-            "total_accounts": self.db.query(func.count(CurbAccount.id)).scalar(),
-            "active_accounts": self.db.query(func.count(CurbAccount.id)).filter(
-                CurbAccount.is_active == True
-            ).scalar(),
-            "total_trips": self.db.query(func.count(CurbTrip.id)).scalar(),
-            "trips_pending_post": self.db.query(func.count(CurbTrip.id)).filter(
-                CurbTrip.status == CurbTripStatus.IMPORTED
-            ).scalar(),
+            "total_accounts": accounts.total_accounts,
+            "active_accounts": accounts.active_accounts,
+            "total_trips": trips.total_trips,
+            "trips_pending_post": trips.trips_pending_post,
         }
     
     def list_trips_with_enhanced_filters(
@@ -421,7 +517,7 @@ class CurbRepository:
         # Base query with optimized joins
         # Only join tables that are actually needed for filtering or display
         query = self.db.query(CurbTrip).options(
-            joinedload(CurbTrip.account),  # Always needed for display
+            selectinload(CurbTrip.account),  # Always needed for display
             joinedload(CurbTrip.driver),    # Always needed for display
             joinedload(CurbTrip.lease),     # Always needed for display
         )
@@ -444,10 +444,11 @@ def get_curb_statistics(
         
         # Get per-account stats
         accounts = repo.get_active_accounts()
+        statistics_by_account = repo.get_statistics_by_account([account.id for account in accounts])
         account_stats = []
         
         for account in accounts:
-            stats = repo.get_account_statistics(account.id)
+            stats = statistics_by_account[account.id]
             account_stats.append({
                 "account_id": account.id,
                 "account_name": account.account_name,
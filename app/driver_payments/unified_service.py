@@ -26,6 +26,11 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Payment method filters are matched by enum name; precomputed lookups avoid
+# raising and catching KeyError for unknown filter values on every request.
+_DTR_PAYMENT_METHOD_BY_NAME = {m.name: m for m in DTRPaymentMethod}
+_INTERIM_PAYMENT_METHOD_BY_NAME = {m.name: m for m in InterimPaymentMethod}
+
 
 class UnifiedPaymentItem:
     """Unified data structure for all payment types"""
@@ -314,11 +319,9 @@ class UnifiedDriverPaymentsService:
                 pass
         
         if filters.get('payment_method'):
-            try:
-                pm = DTRPaymentMethod[filters['payment_method'].upper()]
+            pm = _DTR_PAYMENT_METHOD_BY_NAME.get(filters['payment_method'].upper())
+            if pm is not None:
                 query = query.filter(DTR.payment_method == pm)
-            except KeyError:
-                pass
         
         # Date filters
         if filters.get('week_start_date_from'):
@@ -436,11 +439,9 @@ class UnifiedDriverPaymentsService:
             query = query.filter(InterimPayment.payment_id.ilike(f'%{filters["receipt_number"]}%'))
         
         if filters.get('payment_method'):
-            try:
-                pm = InterimPaymentMethod[filters['payment_method'].upper()]
+            pm = _INTERIM_PAYMENT_METHOD_BY_NAME.get(filters['payment_method'].upper())
+            if pm is not None:
                 query = query.filter(InterimPayment.payment_method == pm)
-            except KeyError:
-                pass
         
         # Amount filters
         if filters.get('total_due_min') is not None:
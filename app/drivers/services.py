@@ -7,7 +7,7 @@ from datetime import date , datetime , timedelta
 
 # Third party imports
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
 # Local imports
 from app.drivers.models import Driver, TLCLicense, DMVLicense
@@ -40,6 +40,19 @@ class DriverService:
             logger.error("Error getting drivers by status: %s", str(e))
             raise e
         
+    def exists(self, db: Session, id: int, is_active: Optional[bool] = True) -> bool:
+        """
+        Check whether a driver exists without loading the row
+        """
+        try:
+            stmt = select(1).where(Driver.id == id)
+            if is_active:
+                stmt = stmt.where(Driver.is_active == is_active)
+            return db.execute(stmt.limit(1)).scalar() is not None
+        except Exception as e:
+            logger.error("Error checking driver existence: %s", e)
+            raise e
+
     def get_drivers(
         self, db: Session,
         id: Optional[int] = None,
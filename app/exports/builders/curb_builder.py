@@ -11,7 +11,7 @@ from decimal import Decimal
 from typing import Dict, Optional
 
 from sqlalchemy import and_, or_, func
-from sqlalchemy.orm import Session, joinedload, Query
+from sqlalchemy.orm import Session, joinedload, selectinload, Query
 
 from app.curb.models import CurbTrip, CurbTripStatus, PaymentType
 from app.drivers.models import Driver, TLCLicense
@@ -42,7 +42,7 @@ def build_curb_export_query(db: Session, filters: Dict) -> Query:
     
     # Build base query with eager loading
     query = db.query(CurbTrip).options(
-        joinedload(CurbTrip.account),
+        selectinload(CurbTrip.account),
         joinedload(CurbTrip.driver).joinedload(Driver.tlc_license),
         joinedload(CurbTrip.vehicle).joinedload(Vehicle.registrations),
         joinedload(CurbTrip.lease),
@@ -3,9 +3,10 @@
 from datetime import date, datetime
 from typing import List, Optional, Tuple, Dict, Any
 
-from sqlalchemy import func
+from sqlalchemy import Integer, cast, delete, func
 from sqlalchemy.orm import Session, joinedload
 
+from app.bpm.models import CaseEntity
 from app.drivers.models import Driver
 from app.interim_payments.models import (
     InterimPayment, InterimPaymentAllocation,
@@ -39,18 +40,50 @@ class InterimPaymentRepository:
         """Fetches a single interim payment by its primary key."""
         return self.db.query(InterimPayment).filter(InterimPayment.id == payment_pk_id).first()
 
+    def get_case_entity_with_payment(
+        self, case_no: str, with_context: bool = False
+    ) -> Tuple[Optional[CaseEntity], Optional[InterimPayment]]:
+        """
+        Fetches the case entity of a BPM case together with the interim payment
+        it points to, in a single query. With with_context=True the payment's
+        driver (with TLC license) and lease (with medallion) are loaded in the
+        same query.
+        """
+        query = (
+            self.db.query(CaseEntity, InterimPayment)
+            .outerjoin(
+                InterimPayment,
+                InterimPayment.id == cast(CaseEntity.identifier_value, Integer),
+            )
+            .filter(CaseEntity.case_no == case_no)
+        )
+        if with_context:
+            query = query.options(
+                joinedload(InterimPayment.driver).joinedload(Driver.tlc_license),
+                joinedload(InterimPayment.lease).joinedload(Lease.medallion),
+            )
+        row = query.first()
+        if not row:
+            return None, None
+        return row[0], row[1]
+
     def get_payment_by_payment_id(self, payment_id: str) -> Optional[InterimPayment]:
         """Fetches a single interim payment by the system-generated Payment ID."""
         return self.db.query(InterimPayment).filter(InterimPayment.payment_id == payment_id).first()
     
     def get_last_payment_id_for_year(self, year: int) -> Optional[str]:
-        """Finds the last used payment_id for a given year to determine the next sequence number."""
+        """
+        Finds the last used payment_id for a given year to determine the next sequence number.
+        The prefix LIKE and descending order are served by the unique payment_id
+        index, so only one index entry is read.
+        """
         prefix = f"INTPAY-{year}-"
         return (
             self.db.query(InterimPayment.payment_id)
             .filter(InterimPayment.payment_id.like(f"{prefix}%"))
             .order_by(InterimPayment.payment_id.desc())
-            .first()
+            .limit(1)
+            .scalar()
         )
 
     def list_payments(
@@ -213,6 +246,18 @@ class InterimPaymentRepository:
         ).all()
 
 
+    def delete_allocations(self, interim_payment_id: int) -> int:
+        """
+        Removes every structured allocation of an interim payment with a single
+        DELETE, without loading the collection. Returns the number of rows removed.
+        """
+        result = self.db.execute(
+            delete(InterimPaymentAllocation).where(
+                InterimPaymentAllocation.interim_payment_id == interim_payment_id
+            )
+        )
+        return result.rowcount
+
     def get_payment_statistics(
         self,
         start_date: date,
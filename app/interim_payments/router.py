@@ -19,6 +19,7 @@ from app.interim_payments.schemas import (
     InterimPaymentDetailResponse,
 )
 from app.interim_payments.models import PaymentMethod
+from app.interim_payments.pdf_service import InterimPaymentPdfService
 from app.interim_payments.services import InterimPaymentService
 from app.interim_payments.stubs import create_stub_interim_payments_response
 from app.users.models import User
@@ -309,8 +310,6 @@ def download_interim_payment_receipt(
             return RedirectResponse(url=receipt_url) if receipt_url else None
         
         # Otherwise, generate PDF on-the-fly
-        from app.interim_payments.pdf_service import InterimPaymentPdfService
-        
         pdf_service = InterimPaymentPdfService(payment_service.repo.db)
         pdf_content = pdf_service.generate_receipt_pdf(payment.id)
         
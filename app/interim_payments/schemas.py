@@ -38,6 +38,27 @@ class InterimPaymentCreate(BaseModel):
     allocations: List[InterimPaymentAllocation] = Field(..., description="A list detailing how the total amount is allocated across obligations.")
 
 
+class InterimPaymentIn(BaseModel):
+    """
+    Schema for the payment details submitted in the interim payment BPM step.
+    Validates and coerces the raw step data in a single pass.
+    """
+    driver_id: int
+    lease_id: int
+    payment_amount: Decimal = Field(..., gt=0, description="The total payment amount received from the driver.")
+    payment_method: PaymentMethod
+    payment_date: datetime
+    notes: Optional[str] = None
+
+
+class InterimPaymentAllocationsIn(BaseModel):
+    """
+    Schema for the allocations submitted in the interim payment BPM allocation
+    step. Amounts are coerced to Decimal once, on validation.
+    """
+    allocations: List[InterimPaymentAllocation] = Field(..., min_length=1)
+
+
 class InterimPaymentResponse(BaseModel):
     """
     Response schema for a single interim payment in a list view, matching the UI grid.
@@ -1,7 +1,9 @@
 ### app/interim_payments/services.py
 
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.bpm.services import bpm_service
@@ -17,18 +19,21 @@ from app.interim_payments.validators import InterimPaymentValidator
 from app.interim_payments.models import (
     InterimPayment, PaymentStatus, InterimPaymentAllocation
 )
+from app.interim_payments.pdf_service import InterimPaymentPdfService
 from app.interim_payments.repository import InterimPaymentRepository
 from app.interim_payments.schemas import InterimPaymentCreate
 from app.ledger.models import (
     PostingCategory, LedgerPosting, EntryType, PostingStatus,
-    LedgerBalance
 )
 from app.ledger.services import LedgerService
 from app.ledger.repository import LedgerRepository
 from app.utils.logger import get_logger
+from app.utils.s3_utils import s3_utils
 
 logger = get_logger(__name__)
 
+PAYMENT_ID_FORMAT = "INTPAY-{year}-{sequence:05d}"
+
 
 class InterimPaymentService:
     """
@@ -48,15 +53,13 @@ class InterimPaymentService:
     def _generate_next_payment_id(self) -> str:
         """Generates a new, unique Interim Payment ID in the format INTPAY-YYYY-#####."""
         current_year = datetime.now(timezone.utc).year
-        last_id_record = self.repo.get_last_payment_id_for_year(current_year)
+        last_payment_id = self.repo.get_last_payment_id_for_year(current_year)
 
         sequence = 1
-        if last_id_record:
-            # last_id_record is a tuple, access the string with [0]
-            last_sequence_str = last_id_record[0].split('-')[-1]
-            sequence = int(last_sequence_str) + 1
+        if last_payment_id:
+            sequence = int(last_payment_id.rsplit('-', 1)[-1]) + 1
 
-        return f"INTPAY-{current_year}-{str(sequence).zfill(5)}"
+        return PAYMENT_ID_FORMAT.format(year=current_year, sequence=sequence)
 
     async def create_interim_payment(
         self, 
@@ -165,30 +168,29 @@ class InterimPaymentService:
             )
             
             # --- Create Structured Allocation Records (NEW) ---
+            # One query for all ledger balances, one executemany INSERT for the records
+            balances = self.ledger_repository.get_latest_balances_by_reference_ids(
+                [alloc.reference_id for alloc in payment_data.allocations],
+                driver_id=payment_data.driver_id,
+                lease_id=payment_data.lease_id,
+            )
+            allocation_rows = []
             for alloc in payment_data.allocations:
-                # Get the ledger balance
-                balance = self.db.query(LedgerBalance).filter(
-                    LedgerBalance.reference_id == alloc.reference_id,
-                    LedgerBalance.driver_id == payment_data.driver_id,
-                    LedgerBalance.lease_id == payment_data.lease_id
-                ).first()
-                
+                balance = balances.get(alloc.reference_id)
                 if balance:
                     # Create allocation record with before/after snapshots
-                    balance_before = balance.balance + alloc.amount  # Before payment
-                    balance_after = balance.balance  # After payment
-                    
-                    allocation_record = InterimPaymentAllocation(
-                        interim_payment_id=created_payment.id,
-                        ledger_balance_id=str(balance.id),
-                        category=alloc.category,
-                        reference_id=alloc.reference_id,
-                        allocated_amount=alloc.amount,
-                        balance_before=balance_before,
-                        balance_after=balance_after,
-                        created_by=user_id
-                    )
-                    self.db.add(allocation_record)
+                    allocation_rows.append({
+                        "interim_payment_id": created_payment.id,
+                        "ledger_balance_id": str(balance.id),
+                        "category": alloc.category,
+                        "reference_id": alloc.reference_id,
+                        "allocated_amount": alloc.amount,
+                        "balance_before": balance.balance + alloc.amount,  # Before payment
+                        "balance_after": balance.balance,  # After payment
+                        "created_by": user_id,
+                    })
+            if allocation_rows:
+                self.db.execute(insert(InterimPaymentAllocation), allocation_rows)
 
             # --- Link to BPM Case ---
             bpm_service.create_case_entity(
@@ -247,6 +249,33 @@ class InterimPaymentService:
                 f"Error validating deposit allocation: {str(e)}"
             ) from e
 
+    def generate_and_store_receipt(self, payment_pk_id: int) -> Optional[str]:
+        """
+        Renders the receipt PDF for an interim payment, uploads it to S3 and
+        stores the S3 key on the payment. Returns the S3 key, or None if the
+        payment does not exist or the upload failed.
+        """
+        payment = self.repo.get_payment_by_id(payment_pk_id)
+        if not payment:
+            logger.warning(f"Interim payment {payment_pk_id} not found for receipt generation")
+            return None
+
+        receipt_pdf = InterimPaymentPdfService(self.db).generate_receipt_pdf(payment.id)
+
+        s3_key = f"receipts/interim_payments/{payment.payment_id}.pdf"
+        if not s3_utils.upload_file(
+            file_obj=receipt_pdf,
+            key=s3_key,
+            content_type="application/pdf"
+        ):
+            logger.error(f"Failed to upload receipt to S3 for payment {payment.payment_id}")
+            return None
+
+        payment.receipt_s3_key = s3_key
+        self.db.commit()
+        logger.info(f"Uploaded receipt to S3: {s3_key}")
+        return s3_key
+
     async def void_interim_payment(
         self, 
         payment_id: str, 
@@ -0,0 +1,39 @@
+### app/interim_payments/tasks.py
+
+"""
+Celery Task Definitions for the Interim Payments Module.
+
+Receipt PDFs are rendered and uploaded to S3 in the background so that the
+allocation step of the interim payment BPM flow does not wait on them.
+"""
+from celery import shared_task
+from app.core.db import SessionLocal
+from app.interim_payments.services import InterimPaymentService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@shared_task(name="interim_payments.generate_receipt")
+def generate_interim_payment_receipt_task(payment_pk_id: int):
+    """
+    Celery task to generate the receipt PDF of an interim payment and store it
+    in S3. If it fails, the receipt is still generated on demand by the
+    receipt download endpoint.
+    """
+    logger.info(
+        "Executing Celery task: generate_interim_payment_receipt_task",
+        payment_pk_id=payment_pk_id,
+    )
+    db = SessionLocal()
+    try:
+        service = InterimPaymentService(db)
+        return service.generate_and_store_receipt(payment_pk_id)
+    except Exception as e:
+        logger.error(
+            f"Celery task generate_interim_payment_receipt_task failed: {e}", exc_info=True
+        )
+        db.rollback()
+        raise
+    finally:
+        db.close()
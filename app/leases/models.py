@@ -7,7 +7,10 @@ from sqlalchemy import (
     Float, ForeignKey, Integer,
     String, DateTime
 )
-from sqlalchemy.orm import Mapped, foreign, mapped_column, relationship
+from sqlalchemy.orm import (
+    Mapped, attribute_keyed_dict, foreign,
+    mapped_column, relationship
+)
 
 from app.core.config import settings
 from app.core.db import Base
@@ -407,6 +410,11 @@ class Lease(Base, AuditMixin):
     lease_configuration: Mapped[list["LeaseConfiguration"]] = relationship(
         back_populates="lease"
     )
+    # Read-only view of the same rows keyed by breakup type, for O(1) lookups
+    lease_configuration_by_type: Mapped[dict[str, "LeaseConfiguration"]] = relationship(
+        collection_class=attribute_keyed_dict("lease_breakup_type"),
+        viewonly=True,
+    )
     lease_schedule: Mapped[list["LeaseSchedule"]] = relationship(
         back_populates="lease",
         primaryjoin="and_(Lease.id == LeaseSchedule.lease_id, LeaseSchedule.is_active == True)",
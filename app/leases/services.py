@@ -421,6 +421,45 @@ class LeaseService:
             logger.error("Error getting lease: %s", str(e), exc_info=True)
             raise e
 
+    def exists(self, db: Session, id: int) -> bool:
+        """Check whether a lease exists without loading the row"""
+        try:
+            stmt = select(1).where(Lease.id == id).limit(1)
+            return db.execute(stmt).scalar() is not None
+        except Exception as e:
+            logger.error("Error checking lease existence: %s", str(e), exc_info=True)
+            raise e
+
+    def get_leases_with_refs(
+        self, db: Session, driver_id: str, status: Optional[str] = None
+    ) -> List[Lease]:
+        """
+        Get all leases of a driver with medallion and vehicle (including
+        registrations) eagerly loaded, for list views that format each lease.
+        """
+        try:
+            query = (
+                db.query(Lease)
+                .options(
+                    joinedload(Lease.medallion),
+                    joinedload(Lease.vehicle).selectinload(Vehicle.registrations),
+                )
+                .filter(
+                    Lease.id.in_(
+                        select(LeaseDriver.lease_id).where(
+                            LeaseDriver.driver_id == driver_id
+                        )
+                    )
+                )
+            )
+            if status:
+                query = query.filter(Lease.lease_status == status)
+
+            return query.order_by(Lease.updated_on.desc(), Lease.created_on.desc()).all()
+        except Exception as e:
+            logger.error("Error getting leases with refs: %s", str(e), exc_info=True)
+            raise e
+
     def get_can_lease(
         self,
         db: Session,
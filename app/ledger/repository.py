@@ -2,10 +2,10 @@
 
 from datetime import date
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from sqlalchemy import case, func, or_, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, load_only
 
 from app.drivers.models import Driver
 from app.ledger.exceptions import BalanceNotFoundError, PostingNotFoundError
@@ -25,6 +25,18 @@ from app.utils.general import apply_multi_filter
 
 logger = get_logger(__name__)
 
+# Columns needed to list open balances, e.g. in the interim payment allocation
+# step; skips the JSON payment refs and the denormalized reporting columns
+OPEN_BALANCE_LIST_COLUMNS = (
+    LedgerBalance.id,
+    LedgerBalance.category,
+    LedgerBalance.reference_id,
+    LedgerBalance.original_amount,
+    LedgerBalance.balance,
+    LedgerBalance.status,
+    LedgerBalance.created_on,
+)
+
 
 class LedgerRepository:
     """
@@ -35,14 +47,19 @@ class LedgerRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_posting(self, posting: LedgerPosting) -> LedgerPosting:
+    def create_posting(self, posting: LedgerPosting, commit: bool = True) -> LedgerPosting:
         """
         Adds a new LedgerPosting record to the session.
-        The caller is responsible for committing the transaction.
+        With commit=False the posting is only flushed and the caller is
+        responsible for committing the transaction.
         """
         self.db.add(posting)
-        self.db.commit()
-        self.db.refresh(posting)
+        if commit:
+            self.db.commit()
+            self.db.refresh(posting)
+        else:
+            # The flush assigns the primary key; no reload is needed
+            self.db.flush()
         logger.info("Created new LedgerPosting", posting_id=posting.id, category=posting.category, amount=posting.amount)
         return posting
 
@@ -148,6 +165,33 @@ class LedgerRepository:
         result = self.db.execute(stmt)
         return result.scalars().first()
 
+    def get_latest_balances_by_reference_ids(
+        self,
+        reference_ids: List[str],
+        driver_id: Optional[int] = None,
+        lease_id: Optional[int] = None,
+    ) -> Dict[str, LedgerBalance]:
+        """
+        Fetches the most recent LedgerBalance for each of the given reference_ids
+        in a single query, optionally restricted to a driver and lease.
+        Reference IDs without a balance are omitted.
+        """
+        if not reference_ids:
+            return {}
+        stmt = (
+            select(LedgerBalance)
+            .where(LedgerBalance.reference_id.in_(set(reference_ids)))
+            .order_by(LedgerBalance.created_on.desc())
+        )
+        if driver_id is not None:
+            stmt = stmt.where(LedgerBalance.driver_id == driver_id)
+        if lease_id is not None:
+            stmt = stmt.where(LedgerBalance.lease_id == lease_id)
+        balances: Dict[str, LedgerBalance] = {}
+        for balance in self.db.execute(stmt).scalars():
+            balances.setdefault(balance.reference_id, balance)
+        return balances
+
     def get_balance_by_id(self, balance_id: str) -> LedgerBalance:
         """
         Fetches a single LedgerBalance by its unique ID.
@@ -213,12 +257,16 @@ class LedgerRepository:
         return list(result.scalars().all())
 
     def get_open_balances_by_lease(
-        self, lease_id: int, driver_id: Optional[int] = None
+        self,
+        lease_id: int,
+        driver_id: Optional[int] = None,
+        columns: Optional[Sequence] = None,
     ) -> List[LedgerBalance]:
         """
         Fetches all OPEN balances for a given lease. If driver_id is provided,
         filters balances for that driver and lease. Results are ordered by
         category priority and created_on (oldest first within each category).
+        If columns are given, only those columns are loaded.
         """
         # Reuse the same category ordering as get_open_balances_for_driver
         category_order = case(
@@ -246,9 +294,22 @@ class LedgerRepository:
 
         if driver_id:
             stmt = stmt.where(LedgerBalance.driver_id == driver_id)
+        if columns:
+            stmt = stmt.options(load_only(*columns))
 
         result = self.db.execute(stmt)
         return list(result.scalars().all())
+
+    def sum_open_balance_by_lease(self, lease_id: int) -> Decimal:
+        """
+        Returns the total of all OPEN balances for a given lease, aggregated
+        in the database.
+        """
+        stmt = select(func.coalesce(func.sum(LedgerBalance.balance), 0)).where(
+            LedgerBalance.lease_id == lease_id,
+            LedgerBalance.status == BalanceStatus.OPEN,
+        )
+        return Decimal(self.db.execute(stmt).scalar())
     
     def get_balance_by_lease_and_category(
         self, 
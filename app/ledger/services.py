@@ -54,10 +54,13 @@ class LedgerService:
         lease_id: Optional[int] = None,
         vehicle_id: Optional[int] = None,
         medallion_id: Optional[int] = None,
+        commit: bool = True,
     ) -> tuple[LedgerPosting, LedgerBalance]:
         """
         Creates a new financial obligation.
         This is an atomic operation that creates both a DEBIT posting and an OPEN balance.
+        Pass commit=False to leave the posting and balance in the caller's
+        transaction so they are committed together with its other changes.
         
         Returns:
             tuple: (LedgerPosting, LedgerBalance) - The created posting and balance objects
@@ -74,7 +77,7 @@ class LedgerService:
                 vehicle_id=vehicle_id,
                 medallion_id=medallion_id,
             )
-            self.repo.create_posting(posting)
+            self.repo.create_posting(posting, commit=commit)
 
             balance_ledger = self.repo.get_balance_by_reference_id(reference_id)
             
@@ -103,7 +106,8 @@ class LedgerService:
                 )
                 new_balance = self.repo.create_balance(balance)
 
-            self.repo.db.commit()
+            if commit:
+                self.repo.db.commit()
             logger.info(
                 "Successfully created obligation.",
                 category=category.value,
@@ -220,7 +224,8 @@ class LedgerService:
         allocations: Dict[str, Decimal],
         driver_id: int,
         lease_id: int,
-        payment_method: str
+        payment_method: str,
+        commit: bool = True,
     ) -> List[LedgerPosting]:
         """
         Applies an interim payment to ledger balances.
@@ -233,6 +238,8 @@ class LedgerService:
             driver_id: ID of the driver making the payment
             lease_id: ID of the lease
             payment_method: Payment method (CASH, CHECK, ACH)
+            commit: Commit after each posting; with False the postings are only
+                flushed and the caller commits them with its own changes
         
         Returns:
             List of created LedgerPosting records
@@ -285,7 +292,7 @@ class LedgerService:
                     payment_source="INTERIM_PAYMENT",
                     payment_method=payment_method
                 )
-                self.repo.create_posting(posting)
+                self.repo.create_posting(posting, commit=commit)
                 created_postings.append(posting)
                 
                 # Update balance
@@ -319,7 +326,8 @@ class LedgerService:
                     excess_amount=excess_amount,
                     driver_id=driver_id,
                     lease_id=lease_id,
-                    payment_method=payment_method
+                    payment_method=payment_method,
+                    commit=commit,
                 )
                 created_postings.extend(excess_postings)
 
@@ -334,7 +342,8 @@ class LedgerService:
         excess_amount: Decimal,
         driver_id: int,
         lease_id: int,
-        payment_method: str
+        payment_method: str,
+        commit: bool = True,
     ) -> List[LedgerPosting]:
         """
         FIXED: Robust excess allocation to lease installments.
@@ -405,7 +414,7 @@ class LedgerService:
                     payment_source="INTERIM_PAYMENT_EXCESS",
                     payment_method=payment_method
                 )
-                self.repo.create_posting(posting)
+                self.repo.create_posting(posting, commit=commit)
                 created_postings.append(posting)
                 
                 # Update balance
@@ -462,7 +471,7 @@ class LedgerService:
                     payment_source="INTERIM_PAYMENT_EXCESS",
                     payment_method=payment_method
                 )
-                self.repo.create_posting(posting)
+                self.repo.create_posting(posting, commit=commit)
                 created_postings.append(posting)
                 
                 new_balance = Decimal(str(balance.balance)) - payment_amount
@@ -498,7 +507,7 @@ class LedgerService:
                 payment_source="INTERIM_PAYMENT_PREPAYMENT",
                 payment_method=payment_method
             )
-            self.repo.create_posting(prepayment_posting)
+            self.repo.create_posting(prepayment_posting, commit=commit)
             created_postings.append(prepayment_posting)
             
             logger.info(
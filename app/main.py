@@ -4,6 +4,14 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+# Try importing orjson for faster response serialization
+try:
+    import orjson  # noqa: F401
+    DEFAULT_RESPONSE_CLASS = ORJSONResponse
+except ImportError:
+    DEFAULT_RESPONSE_CLASS = JSONResponse
 
 import app.audit_trail.models
 
@@ -90,6 +98,7 @@ bat_app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=DEFAULT_RESPONSE_CLASS,
 )
 
 # Configure logging
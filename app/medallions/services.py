@@ -118,9 +118,13 @@ class MedallionService:
         
     def upsert_medallion(
             self, db: Session,
-            medallion_data: dict
+            medallion_data: dict,
+            flush: bool = True
     ) -> Medallion:
-        """Upsert a medallion"""
+        """
+        Upsert a medallion. With flush=False the write is left pending for
+        the caller's next flush or commit.
+        """
         try:
             if not medallion_data.get("id"):
                 medallion = Medallion(**medallion_data)
@@ -133,7 +137,8 @@ class MedallionService:
                 else:
                     raise ValueError("Medallion not found")
                 
-            db.flush()
+            if flush:
+                db.flush()
             
             return medallion
         except Exception as e:
@@ -77,6 +77,19 @@ def format_medallion_owner_response(db , medallion_owner):
 
     return owner
     
+def get_medallion_owner_name(medallion) -> str:
+    """
+    Get only the owner name shown in format_medallion_response, without
+    building the rest of the medallion response.
+    """
+    owner = medallion.owner
+    if owner:
+        if owner.medallion_owner_type == "I" and owner.individual:
+            return f"{owner.individual.first_name} {owner.individual.last_name}"
+        if owner.medallion_owner_type == "C" and owner.corporation:
+            return owner.corporation.name
+    return "Unknown"
+
 def format_medallion_response(medallion, has_documents: bool = False, in_storage: bool = False, has_audit_trail: bool = False) -> dict:
     """Helper function to format medallion response"""
     medallion_lease = medallion.lease
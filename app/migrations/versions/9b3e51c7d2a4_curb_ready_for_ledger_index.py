@@ -0,0 +1,45 @@
+"""curb ready for ledger index
+
+Revision ID: 9b3e51c7d2a4
+Revises: 3ed36ff2155c
+Create Date: 2026-10-17 10:12:08.417302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e51c7d2a4'
+down_revision: Union[str, Sequence[str], None] = '3ed36ff2155c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Rebuild idx_curb_ready_for_ledger for the ledger posting query.
+    
+    The query filters on status and a start_time window and requires
+    driver_id and lease_id to be mapped. Leading with (status, start_time)
+    turns the window into an index range, and carrying driver_id/lease_id
+    lets MySQL discard unmapped trips before reading the row.
+    """
+    op.drop_index('idx_curb_ready_for_ledger', 'curb_trips')
+    op.create_index(
+        'idx_curb_ready_for_ledger',
+        'curb_trips',
+        ['status', 'start_time', 'driver_id', 'lease_id']
+    )
+
+
+def downgrade() -> None:
+    """Restore the original idx_curb_ready_for_ledger column order"""
+    op.drop_index('idx_curb_ready_for_ledger', 'curb_trips')
+    op.create_index(
+        'idx_curb_ready_for_ledger',
+        'curb_trips',
+        ['status', 'driver_id', 'start_time']
+    )
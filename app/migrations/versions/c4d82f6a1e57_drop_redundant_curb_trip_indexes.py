@@ -0,0 +1,42 @@
+"""drop redundant curb trip indexes
+
+Revision ID: c4d82f6a1e57
+Revises: 9b3e51c7d2a4
+Create Date: 2026-10-17 11:02:45.931864
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d82f6a1e57'
+down_revision: Union[str, Sequence[str], None] = '9b3e51c7d2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Single-column indexes whose column is already the primary key or the
+# leading column of a composite index (which also backs the foreign keys)
+REDUNDANT_INDEXES = {
+    'idx_curb_trips_id': ['id'],
+    'idx_curb_trips_account_id': ['account_id'],
+    'idx_curb_trips_status': ['status'],
+    'idx_curb_trips_driver_id': ['driver_id'],
+    'idx_curb_trips_lease_id': ['lease_id'],
+    'idx_curb_trips_payment_type': ['payment_type'],
+}
+
+
+def upgrade() -> None:
+    """Drop single-column curb_trips indexes covered by composites"""
+    for index_name in REDUNDANT_INDEXES:
+        op.drop_index(index_name, 'curb_trips')
+
+
+def downgrade() -> None:
+    """Recreate the single-column curb_trips indexes"""
+    for index_name, columns in REDUNDANT_INDEXES.items():
+        op.create_index(index_name, 'curb_trips', columns)
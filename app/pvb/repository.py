@@ -1,13 +1,14 @@
 ### app/pvb/repository.py
 
 from datetime import date, datetime, time
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
-from sqlalchemy import func, update , or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import String, cast, func, update , or_
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 
+from app.bpm.models import Case, CaseEntity
 from app.drivers.models import Driver
-from app.medallions.models import Medallion
+from app.medallions.models import Medallion, MedallionOwner
 from app.vehicles.models import Vehicle
 from app.leases.models import Lease
 from app.pvb.models import (
@@ -21,6 +22,45 @@ from app.utils.general import apply_multi_filter
 
 logger = get_logger(__name__)
 
+# Columns read by the edit PVB flow (format_pvb_violation plus the foreign keys
+# needed to resolve relationships), so wide text/flag columns can be skipped.
+PVB_DETAIL_COLUMNS = (
+    PVBViolation.id,
+    PVBViolation.source,
+    PVBViolation.plate,
+    PVBViolation.state,
+    PVBViolation.type,
+    PVBViolation.summons,
+    PVBViolation.issue_date,
+    PVBViolation.issue_time,
+    PVBViolation.violation_code,
+    PVBViolation.amount_due,
+    PVBViolation.fine,
+    PVBViolation.processing_fee,
+    PVBViolation.payment,
+    PVBViolation.disposition,
+    PVBViolation.disposition_change_date,
+    PVBViolation.note,
+    PVBViolation.reduce_to,
+    PVBViolation.updated_on,
+    PVBViolation.driver_id,
+    PVBViolation.lease_id,
+    PVBViolation.vehicle_id,
+    PVBViolation.medallion_id,
+)
+
+# Columns needed to post a violation to the ledger
+PVB_LEDGER_COLUMNS = (
+    PVBViolation.id,
+    PVBViolation.status,
+    PVBViolation.summons,
+    PVBViolation.amount_due,
+    PVBViolation.driver_id,
+    PVBViolation.lease_id,
+    PVBViolation.vehicle_id,
+    PVBViolation.medallion_id,
+)
+
 
 class PVBRepository:
     """
@@ -84,9 +124,91 @@ class PVBRepository:
         """Fetches a single violation by its unique summons number."""
         return self.db.query(PVBViolation).filter(PVBViolation.summons == summons).first()
     
-    def get_violation_by_id(self, violation_id: int) -> Optional[PVBViolation]:
-        """Retrieves a single violation record by its ID."""
-        return self.db.query(PVBViolation).filter(PVBViolation.id == violation_id).first()
+    def get_violation_by_id(
+        self, violation_id: int, columns: Optional[Sequence] = None
+    ) -> Optional[PVBViolation]:
+        """
+        Retrieves a single violation record by its ID. When columns are given,
+        only those are loaded and the rest are deferred.
+        """
+        query = self.db.query(PVBViolation)
+        if columns:
+            query = query.options(load_only(*columns))
+        return query.filter(PVBViolation.id == violation_id).first()
+
+    def get_violation_by_id_with_refs(self, violation_id: int) -> Optional[PVBViolation]:
+        """Retrieves a single violation with its driver and lease eagerly loaded."""
+        return (
+            self.db.query(PVBViolation)
+            .options(
+                selectinload(PVBViolation.driver),
+                selectinload(PVBViolation.lease),
+            )
+            .filter(PVBViolation.id == violation_id)
+            .first()
+        )
+
+    def get_violation_for_case(
+        self, case_no: str, entity_name: str = "pvb_violation"
+    ) -> Tuple[Optional[PVBViolation], Optional[Case]]:
+        """
+        Retrieves the violation linked to a BPM case together with the case itself
+        in one query. Driver and lease are loaded for audit descriptions, and the
+        case type and step config for the audit trail.
+        """
+        row = (
+            self.db.query(PVBViolation, Case)
+            .join(
+                CaseEntity,
+                CaseEntity.identifier_value == cast(PVBViolation.id, String),
+            )
+            .outerjoin(Case, Case.case_no == CaseEntity.case_no)
+            .options(
+                selectinload(PVBViolation.driver),
+                selectinload(PVBViolation.lease),
+                joinedload(Case.case_type),
+                joinedload(Case.case_step_config),
+            )
+            .filter(
+                CaseEntity.case_no == case_no,
+                CaseEntity.entity_name == entity_name,
+            )
+            .order_by(Case.created_on.asc())
+            .first()
+        )
+        if not row:
+            return None, None
+        return row[0], row[1]
+
+    def get_violation_full(
+        self, violation_id: int, columns: Optional[Sequence] = None
+    ) -> Optional[PVBViolation]:
+        """
+        Retrieves a single violation with its driver, lease, medallion and vehicle
+        relationships eagerly loaded, so the BPM fetch step needs no lazy loads.
+        When columns are given, only those violation columns are loaded.
+        """
+        query = self.db.query(PVBViolation)
+        if columns:
+            query = query.options(load_only(*columns))
+        return (
+            query
+            .options(
+                joinedload(PVBViolation.lease).options(
+                    joinedload(Lease.medallion)
+                    .joinedload(Medallion.owner)
+                    .options(
+                        joinedload(MedallionOwner.individual),
+                        joinedload(MedallionOwner.corporation),
+                    ),
+                    joinedload(Lease.vehicle).selectinload(Vehicle.registrations),
+                    selectinload(Lease.lease_configuration_by_type),
+                ),
+                selectinload(PVBViolation.driver).joinedload(Driver.tlc_license),
+            )
+            .filter(PVBViolation.id == violation_id)
+            .first()
+        )
 
     def get_violations_by_status(
         self, status: PVBViolationStatus
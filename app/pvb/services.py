@@ -21,7 +21,7 @@ from app.pvb.models import (
     PVBImport, PVBImportStatus, PVBSource,
     PVBViolation, PVBViolationStatus, PVBDisposition
 )
-from app.pvb.repository import PVBRepository
+from app.pvb.repository import PVB_LEDGER_COLUMNS, PVBRepository
 from app.ledger.models import PostingCategory
 from app.ledger.repository import LedgerRepository
 from app.ledger.services import LedgerService
@@ -47,6 +47,13 @@ class PVBService:
         self.repo = PVBRepository(db)
         self.ledger_repo = LedgerRepository(db)
 
+    def get_violation_for_case(self, case_no: str):
+        """
+        Returns the (violation, case) pair for a BPM case number, resolved
+        through its case entity in a single query.
+        """
+        return self.repo.get_violation_for_case(case_no)
+
     def process_uploaded_csv(self, file_stream: io.BytesIO, file_name: str, user_id: int):
         """
         Parses an uploaded PVB CSV, creates an import record, saves raw transaction
@@ -393,7 +400,7 @@ class PVBService:
 
             for txn_id in transaction_ids:
                 try:
-                    transaction = self.repo.get_violation_by_id(txn_id)
+                    transaction = self.repo.get_violation_by_id(txn_id, columns=PVB_LEDGER_COLUMNS)
                     if not transaction:
                         errors.append({
                             "transaction_id": txn_id,
@@ -47,7 +47,7 @@ def parser(
 
     Args:
         name: Unique name for the parser (e.g., "roles")
-        sheet_names: List of sheet names required by this parser (from settings)
+        sheet_names: List of sheet names required by this parser (from settings.sheets)
         version: Version number (default: "1.0")
         deprecated: Whether this parser is deprecated (default: False)
         description: Optional description
@@ -57,7 +57,7 @@ def parser(
 
         @parser(
             name="roles",
-            sheet_names=[data_loader_settings.parser_roles_sheet],
+            sheet_names=[data_loader_settings.sheets.roles],
             version="1.0",
             description="Process roles from Excel"
         )
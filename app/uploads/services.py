@@ -3,7 +3,7 @@
 from datetime import datetime, timezone
 from typing import List, Optional, Union
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.uploads.models import Document
@@ -78,6 +78,48 @@ class UploadService:
             logger.error("Error getting documents: %s", str(e))
             raise e
 
+    def get_documents_multi(
+        self,
+        db: Session,
+        object_type: str,
+        object_id: int,
+        document_types: Optional[List[str]] = None,
+        like_document_types: Optional[List[str]] = None,
+        sort_by: Optional[str] = "created_on",
+        sort_order: Optional[str] = "desc",
+    ) -> List[dict]:
+        """
+        Get every document of an object matching any of the exact or partial
+        document types in a single query. Callers partition the result by type.
+        """
+        try:
+            type_filters = [
+                Document.document_type.in_(document_types)
+            ] if document_types else []
+            type_filters.extend(
+                Document.document_type.ilike(f"%{like_type}%")
+                for like_type in like_document_types or []
+            )
+
+            stmt = select(Document).where(
+                Document.object_type.ilike(f"%{object_type}%"),
+                Document.object_lookup_id == object_id,
+            )
+            if type_filters:
+                stmt = stmt.where(or_(*type_filters))
+
+            if sort_by and hasattr(Document, sort_by):
+                column = getattr(Document, sort_by)
+                stmt = stmt.order_by(
+                    column.desc() if sort_order == "desc" else column.asc()
+                )
+
+            documents = db.execute(stmt).scalars().all()
+            return [doc.to_dict() for doc in documents]
+        except Exception as e:
+            logger.error("Error getting documents: %s", str(e))
+            raise e
+
     def create_document(
         self,
         db: Session,
@@ -9,12 +9,16 @@ from typing import Optional
 
 # Third party imports
 import requests
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.audit_trail.services import audit_trail_service
 from app.bpm.services import bpm_service
+from app.bpm_flows.update_vehicle_location.flows import (
+    VEHICLE_LOCATION_RULES_ETAG,
+    VEHICLE_LOCATION_RULES_JSON,
+)
 
 # Local imports
 from app.core.config import settings
@@ -1707,6 +1711,28 @@ def delete_vehicle_expense(
         logger.error("Error deleting vehicle expense: %s", str(e))
         raise e
 
+@router.get("/vehicle/location_rules", summary="Vehicle location rules by status")
+def get_vehicle_location_rules(
+    request: Request,
+    logged_in_user: User = Depends(get_current_user),
+):
+    """
+    Return the location rules for every vehicle status. The rules are static,
+    so clients can revalidate with If-None-Match and get a 304 without a body.
+    """
+    headers = {
+        "ETag": VEHICLE_LOCATION_RULES_ETAG,
+        "Cache-Control": "private, max-age=3600",
+    }
+    if request.headers.get("if-none-match") == VEHICLE_LOCATION_RULES_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=VEHICLE_LOCATION_RULES_JSON,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
 @router.put("/update_location" , summary = "Update Vehicle Location")
 def update_vehicle_location(
     input: UpdateVehicleLocation,
@@ -1,13 +1,14 @@
 ### app/vehicles/services.py
 
 # Standard library imports
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from datetime import date
 
 # Third party imports
-from sqlalchemy import asc, desc, func , or_ , String, cast
-from sqlalchemy.orm import Session
+from sqlalchemy import asc, desc, func , insert, or_ , String, cast, literal, select, union_all
+from sqlalchemy.orm import Session, joinedload, load_only
 
+from app.core.db import get_current_user_id
 from app.utils.logger import get_logger
 from app.medallions.models import Medallion
 from app.uploads.models import Document
@@ -28,6 +29,46 @@ from app.vehicles.schemas import HackupStatus, RegistrationStatus, VehicleStatus
 
 logger = get_logger(__name__)
 
+# The one-to-one task relationships of a vehicle hackup
+HACKUP_TASK_RELATIONSHIPS = (
+    "paint_task",
+    "camera_task",
+    "partition_task",
+    "meter_task",
+    "rooftop_task",
+    "dmv_registration_task",
+    "tlc_inspection_task",
+    "dealership_task",
+    "bat_garage_task",
+)
+
+# Columns read by format_vehicle_details and the vehicle fetch steps
+VEHICLE_DETAIL_COLUMNS = (
+    Vehicle.id,
+    Vehicle.vin,
+    Vehicle.make,
+    Vehicle.model,
+    Vehicle.year,
+    Vehicle.tsp,
+    Vehicle.security_type,
+    Vehicle.cylinders,
+    Vehicle.color,
+    Vehicle.vehicle_type,
+    Vehicle.base_price,
+    Vehicle.sales_tax,
+    Vehicle.vehicle_status,
+    Vehicle.vehicle_total_price,
+    Vehicle.vehicle_hack_up_cost,
+    Vehicle.vehicle_true_cost,
+    Vehicle.vehicle_lifetime_cap,
+    Vehicle.invoice_number,
+    Vehicle.invoice_date,
+    Vehicle.entity_id,
+    Vehicle.dealer_id,
+    Vehicle.medallion_id,
+    Vehicle.updated_on,
+)
+
 
 class VehicleService:
     """Service for vehicle operations"""
@@ -164,10 +205,30 @@ class VehicleService:
         insurance_number: Optional[str] = None,
         dealer_id: Optional[int] = None,
         multiple: bool = False,
+        eager: Optional[List[str]] = None,
+        columns: Optional[Sequence] = None,
     ) -> Union[Vehicle, List[Vehicle], None]:
-        """Get vehicles by ID, VIN, or medallion ID"""
+        """
+        Get vehicles by ID, VIN, or medallion ID. Relationships named in eager
+        are joined into the same query, and columns restricts the vehicle
+        columns loaded.
+        """
         try:
+            if str(vehicle_id).isdigit() and not multiple and not eager and not columns and not any((
+                vin, invoice_number, medallion_id, medallion_number, plate_number,
+                meter_serial_number, insurance_number, dealer_id,
+            )):
+                # Plain id lookups are served from the session identity map,
+                # so repeated calls within a request do not hit the database
+                return db.get(Vehicle, int(vehicle_id))
+
             query = db.query(Vehicle)
+            if columns:
+                query = query.options(load_only(*columns))
+            if eager:
+                query = query.options(
+                    *(joinedload(getattr(Vehicle, name)) for name in eager)
+                )
 
             is_hackup_join = False
 
@@ -211,23 +272,96 @@ class VehicleService:
             logger.error("Error getting vehicles: %s", str(e))
             raise e
 
-    def upsert_vehicle(self, db: Session, vehicle_data: dict) -> Vehicle:
-        """Upsert a vehicle"""
+    def find_vehicles_by_any(
+        self,
+        db: Session,
+        plate_number: Optional[str] = None,
+        meter_serial_number: Optional[str] = None,
+        lib_insurance_number: Optional[str] = None,
+        wc_insurance_number: Optional[str] = None,
+        exclude_vehicle_id: Optional[int] = None,
+    ) -> Dict[Tuple[str, str], Tuple[int, str]]:
+        """
+        Find vehicles holding any of the given plate, meter serial or insurance
+        numbers in a single query. Returns (field, value) -> (vehicle id, vin)
+        for every match, keyed by the value as passed in (the column collation
+        may match other casing or trailing spaces); empty inputs are skipped.
+        """
+        try:
+            lookups = []
+            if plate_number:
+                lookups.append(
+                    select(
+                        literal("plate_number").label("field"),
+                        literal(plate_number).label("value"),
+                        Vehicle.id, Vehicle.vin,
+                    ).select_from(Vehicle).join(
+                        VehicleRegistration, Vehicle.id == VehicleRegistration.vehicle_id
+                    ).where(VehicleRegistration.plate_number == plate_number)
+                )
+            if meter_serial_number:
+                lookups.append(
+                    select(
+                        literal("meter_serial_number").label("field"),
+                        literal(meter_serial_number).label("value"),
+                        Vehicle.id, Vehicle.vin,
+                    ).select_from(Vehicle).join(
+                        VehicleHackUp, Vehicle.id == VehicleHackUp.vehicle_id
+                    ).where(VehicleHackUp.meter_serial_number == meter_serial_number)
+                )
+            for insurance_number in dict.fromkeys((lib_insurance_number, wc_insurance_number)):
+                if not insurance_number:
+                    continue
+                # Only hacked-up vehicles count, as in get_vehicles
+                lookups.append(
+                    select(
+                        literal("insurance_number").label("field"),
+                        literal(insurance_number).label("value"),
+                        Vehicle.id, Vehicle.vin,
+                    ).select_from(Vehicle).join(
+                        VehicleHackUp, Vehicle.id == VehicleHackUp.vehicle_id
+                    ).join(
+                        VehicleInsurance, Vehicle.id == VehicleInsurance.vehicle_id
+                    ).where(VehicleInsurance.insurance_number == insurance_number)
+                )
+            if not lookups:
+                return {}
+
+            if exclude_vehicle_id is not None:
+                lookups = [
+                    lookup.where(Vehicle.id != exclude_vehicle_id) for lookup in lookups
+                ]
+
+            matches = {}
+            for field, value, vehicle_id, vin in db.execute(union_all(*lookups)):
+                matches.setdefault((field, value), (vehicle_id, vin))
+            return matches
+        except Exception as e:
+            logger.error("Error finding vehicles: %s", str(e))
+            raise e
+
+    def upsert_vehicle(self, db: Session, vehicle_data: dict, flush: bool = True) -> Vehicle:
+        """
+        Upsert a vehicle. With flush=False the write is left pending for the
+        caller's next flush or commit.
+        """
         try:
             if vehicle_data.get("id"):
                 vehicle = self.get_vehicles(db, vehicle_id=vehicle_data.get("id"))
                 if vehicle:
                     for key, value in vehicle_data.items():
                         setattr(vehicle, key, value)
-                    db.flush()
-                    db.refresh(vehicle)
+                    if flush:
+                        db.flush()
+                        db.refresh(vehicle)
                     return vehicle
             else:
                 vehicle = Vehicle(**vehicle_data)
                 vehicle.vehicle_status = VehicleStatus.IN_PROGRESS
                 db.add(vehicle)
-                db.flush()
-                db.refresh(vehicle)
+                if flush:
+                    db.flush()
+                    db.refresh(vehicle)
                 return vehicle
         except Exception as e:
             logger.error("Error upserting vehicle: %s", str(e))
@@ -241,10 +375,22 @@ class VehicleService:
         hackup_status: Optional[HackupStatus] = None,
         multiple: bool = False,
         sort_order: Optional[str] = "desc",
+        eager: Optional[List[str]] = None,
+        for_update: bool = False,
     ) -> Union[VehicleHackUp, List[VehicleHackUp], None]:
-        """Get vehicle hackup by ID, status, or multiple"""
+        """
+        Get vehicle hackup by ID, status, or multiple. Relationships named in
+        eager are joined into the same query. With for_update the hackup row
+        stays locked until the transaction ends.
+        """
         try:
             query = db.query(VehicleHackUp)
+            if eager:
+                query = query.options(
+                    *(joinedload(getattr(VehicleHackUp, name)) for name in eager)
+                )
+            if for_update:
+                query = query.with_for_update(of=VehicleHackUp)
             if vehicle_hackup_id:
                 query = query.filter(VehicleHackUp.id == vehicle_hackup_id)
             if vehicle_id:
@@ -269,9 +415,12 @@ class VehicleService:
             raise e
 
     def upsert_vehicle_hackup(
-        self, db: Session, vehicle_hackup_data: dict
+        self, db: Session, vehicle_hackup_data: dict, flush: bool = True
     ) -> VehicleHackUp:
-        """Upsert a vehicle hackup"""
+        """
+        Upsert a vehicle hackup. With flush=False the write is left pending
+        for the caller's next flush or commit.
+        """
         try:
             if vehicle_hackup_data.get("id"):
                 vehicle_hackup = self.get_vehicle_hackup(
@@ -280,15 +429,17 @@ class VehicleService:
                 if vehicle_hackup:
                     for key, value in vehicle_hackup_data.items():
                         setattr(vehicle_hackup, key, value)
-                    db.flush()
-                    db.refresh(vehicle_hackup)
+                    if flush:
+                        db.flush()
+                        db.refresh(vehicle_hackup)
                     return vehicle_hackup
             else:
                 vehicle_hackup = VehicleHackUp(**vehicle_hackup_data)
                 vehicle_hackup.status = HackupStatus.INPROGRESS
                 db.add(vehicle_hackup)
-                db.flush()
-                db.refresh(vehicle_hackup)
+                if flush:
+                    db.flush()
+                    db.refresh(vehicle_hackup)
                 return vehicle_hackup
         except Exception as e:
             logger.error("Error upserting vehicle hackup: %s", str(e))
@@ -331,9 +482,12 @@ class VehicleService:
             raise e
 
     def upsert_registration(
-        self, db: Session, registration_data: dict
+        self, db: Session, registration_data: dict, flush: bool = True
     ) -> VehicleRegistration:
-        """Upsert a vehicle registration"""
+        """
+        Upsert a vehicle registration. With flush=False the write is left
+        pending for the caller's next flush or commit.
+        """
         try:
             if registration_data.get("id"):
                 registration = self.get_vehicle_registration(
@@ -342,14 +496,16 @@ class VehicleService:
                 if registration:
                     for key, value in registration_data.items():
                         setattr(registration, key, value)
-                    db.flush()
-                    db.refresh(registration)
+                    if flush:
+                        db.flush()
+                        db.refresh(registration)
                     return registration
             else:
                 registration = VehicleRegistration(**registration_data)
                 db.add(registration)
-                db.flush()
-                db.refresh(registration)
+                if flush:
+                    db.flush()
+                    db.refresh(registration)
                 return registration
         except Exception as e:
             logger.error("Error upserting vehicle registration: %s", str(e))
@@ -624,6 +780,43 @@ class VehicleService:
         except Exception as e:
             logger.error("Error upserting hackup tasks: %s", str(e))
 
+    def bulk_upsert_hackup_tasks(
+        self, db: Session, hackup_tasks: List[dict]
+    ) -> Dict[str, HackUpTasks]:
+        """
+        Upsert several hackup tasks with one lookup and a single flush.
+        Returns the tasks keyed by task_name.
+        """
+        try:
+            existing_ids = [task["id"] for task in hackup_tasks if task.get("id")]
+            existing = {}
+            if existing_ids:
+                existing = {
+                    task.id: task
+                    for task in db.query(HackUpTasks).filter(
+                        HackUpTasks.id.in_(existing_ids)
+                    )
+                }
+
+            upserted = {}
+            for task_data in hackup_tasks:
+                hackup_task = existing.get(task_data.get("id"))
+                if hackup_task:
+                    for key, value in task_data.items():
+                        setattr(hackup_task, key, value)
+                else:
+                    hackup_task = HackUpTasks(
+                        **{key: value for key, value in task_data.items() if key != "id"}
+                    )
+                    db.add(hackup_task)
+                upserted[task_data["task_name"]] = hackup_task
+
+            db.flush()
+            return upserted
+        except Exception as e:
+            logger.error("Error bulk upserting hackup tasks: %s", str(e))
+            raise e
+
     def get_vehicle_expenses(self , 
                              db: Session, 
                              lookup_id: Optional[int] = None,
@@ -685,6 +878,21 @@ class VehicleService:
             logger.error("Error upserting vehicle expenses: %s", str(e))
             raise e
 
+    def bulk_insert_vehicle_expenses(self, db: Session, vehicle_expenses: List[dict]) -> None:
+        """Insert several vehicle expenses in a single executemany statement"""
+        try:
+            if not vehicle_expenses:
+                return
+            # Core inserts skip the before_flush hook, so set created_by here
+            user_id = get_current_user_id(db)
+            db.execute(
+                insert(VehicleExpensesAndCompliance),
+                [{**expense, "created_by": user_id} for expense in vehicle_expenses],
+            )
+        except Exception as e:
+            logger.error("Error inserting vehicle expenses: %s", str(e))
+            raise e
+
     def get_vehicle_insurance(self,
                              db: Session,
                              insurance_id: Optional[int] = None,
@@ -725,6 +933,22 @@ class VehicleService:
             logger.error("Error getting vehicle insurance: %s", str(e))
             raise e
         
+    def get_vehicle_insurances(
+        self, db: Session, vehicle_id: int, insurance_types: List[str]
+    ) -> Dict[str, VehicleInsurance]:
+        """Get the insurances of a vehicle for several types in one query, keyed by type"""
+        try:
+            insurances = {}
+            for insurance in db.query(VehicleInsurance).filter(
+                VehicleInsurance.vehicle_id == vehicle_id,
+                VehicleInsurance.insurance_type.in_(insurance_types),
+            ):
+                insurances.setdefault(insurance.insurance_type, insurance)
+            return insurances
+        except Exception as e:
+            logger.error("Error getting vehicle insurances: %s", str(e))
+            raise e
+
     def upsert_vehicle_insurance(self, db: Session, vehicle_insurance: dict):
         """Upsert vehicle insurance"""
         try:
@@ -746,4 +970,19 @@ class VehicleService:
             logger.error("Error upserting vehicle insurance: %s", str(e))
             raise e
 
+    def bulk_insert_vehicle_insurances(self, db: Session, vehicle_insurances: List[dict]) -> None:
+        """Insert several vehicle insurances in a single executemany statement"""
+        try:
+            if not vehicle_insurances:
+                return
+            # Core inserts skip the before_flush hook, so set created_by here
+            user_id = get_current_user_id(db)
+            db.execute(
+                insert(VehicleInsurance),
+                [{**insurance, "created_by": user_id} for insurance in vehicle_insurances],
+            )
+        except Exception as e:
+            logger.error("Error inserting vehicle insurances: %s", str(e))
+            raise e
+
 vehicle_service = VehicleService()
@@ -49,6 +49,7 @@ app.autodiscover_tasks(
         "app.driver_payments",
         "app.leases",
         "app.drivers",
+        "app.interim_payments",
         "app.exports",  # Added for async export tasks
         "app.notifications",
     ]